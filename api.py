@@ -2,26 +2,31 @@ from __future__ import annotations
 
 from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
-import os, re, json, shutil, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import os, re, shutil, asyncio, bisect, functools, time
 
-import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 import httpx
+import orjson
 
 # --- Internal modules ---
 from modules.schema_sampler import sample_schema, parse_s3_uri
-from modules.schema_store import save_schema, dataset_id_from_s3, get_version, list_versions
+from modules.schema_store import save_schema, dataset_id_from_s3, get_version, list_version_summaries, get_latest_many
 from modules.featurestore_schema import describe_feature_group, list_feature_groups
 from modules.sql_collector import collect_from_repo
 from modules.sql_lineage_store import put, get_by_pipeline, get_by_job
 from modules.connectors.git_fetch import shallow_clone
 from modules.sql_try import try_parse
+from modules.aws_clients import get_session, get_client
 
 # 순환 import 방지용 별칭 임포트 (lineage.py)
 import lineage as lineage_lib
@@ -29,7 +34,28 @@ import lineage as lineage_lib
 # -----------------------------------------------------------------------------#
 # FastAPI
 # -----------------------------------------------------------------------------#
-app = FastAPI(title="SageMaker Lineage API", version="1.6.1")
+# 외부 서비스(collector 등) 호출별 타임아웃(초)
+HTTP_TIMEOUTS: Dict[str, float] = {
+    "rds_auto": 60.0,
+    "cross_check": 300.0,
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 앱 수명 동안 공유하는 httpx 클라이언트 (요청마다 TCP/TLS 핸드셰이크 방지)
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(15.0, connect=5.0),
+    ) as client:
+        app.state.http = client
+        yield
+
+app = FastAPI(
+    title="SageMaker Lineage API",
+    version="1.6.1",
+    default_response_class=ORJSONResponse,   # 대형 라인리지/스키마 응답 직렬화 가속
+    lifespan=lifespan,
+)
 
 # CORS (운영 시 특정 도메인으로 제한 권장)
 app.add_middleware(
@@ -40,6 +66,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (라인리지/스키마 JSON은 수백 KB까지 커지고 압축률이 높음, 작은 응답은 그대로)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+
 # -----------------------------------------------------------------------------#
 # boto3 공통 설정
 # -----------------------------------------------------------------------------#
@@ -53,6 +82,19 @@ _BOTO_CFG = Config(
 # Utils
 # -----------------------------------------------------------------------------#
 S3_RE = re.compile(r"^s3://([^/]+)/?(.*)$")
+_STEP_RE = re.compile(r"(\d+_)?([a-zA-Z0-9\-_]+)")
+
+# /lineage/schema 의 FeatureGroup describe 동시 호출 상한
+_FG_DESCRIBE_CONCURRENCY = int(os.getenv("FG_DESCRIBE_CONCURRENCY", "16"))
+# scan_if_missing 시 URI별 스키마 스캔 동시 실행 상한
+_SCHEMA_SCAN_CONCURRENCY = int(os.getenv("SCHEMA_SCAN_CONCURRENCY", "8"))
+
+# /sagemaker/pipelines 리전 fan-out / 리전 내 최신 실행 조회 동시 호출 상한
+_REGION_CONCURRENCY = int(os.getenv("REGION_CONCURRENCY", "32"))
+_LATEST_EXEC_CONCURRENCY = int(os.getenv("LATEST_EXEC_CONCURRENCY", "8"))
+
+# 데이터가 아닌 대상(코드/모델 파일) 확장자
+_NON_DATA_SUFFIXES = (".py", ".ipynb", ".tar.gz", ".model")
 
 def data_node_id_from_uri(uri: str) -> str:
     # 프론트 데이터 노드 id 규칙에 맞춰 통일
@@ -62,21 +104,65 @@ def is_data_uri(uri: str) -> bool:
     """
     코드/모델 파일 등 데이터가 아닌 대상은 제외
     """
-    if not isinstance(uri, str):
-        return False
-    if not uri.startswith("s3://"):
-        return False
-    lower = uri.lower()
-    if lower.endswith(".py") or lower.endswith(".ipynb") or lower.endswith(".tar.gz") or lower.endswith(".model"):
-        return False
-    return True
+    return (
+        isinstance(uri, str)
+        and uri.startswith("s3://")
+        and not uri.lower().endswith(_NON_DATA_SUFFIXES)
+    )
+
+_CACHE_TTL_S = float(os.getenv("LINEAGE_CACHE_TTL_S", "30"))
+_CACHE_MAX_ENTRIES = 256
+
+def async_ttl_cache(ttl_s: float):
+    """
+    async 함수 결과를 인자 기준으로 ttl_s초 동안 메모리에 캐시.
+    캐시 접근은 이벤트 루프 안에서 await 없이 이뤄지므로 별도 락은 두지 않는다.
+    """
+    def deco(fn):
+        cache: Dict[Any, Tuple[float, Any]] = {}
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            hit = cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+            value = await fn(*args, **kwargs)
+            now = time.monotonic()
+            if len(cache) >= _CACHE_MAX_ENTRIES:
+                for k in [k for k, (exp, _) in cache.items() if exp <= now]:
+                    del cache[k]
+            cache[key] = (now + ttl_s, value)
+            return value
+        return wrapper
+    return deco
+
+@async_ttl_cache(_CACHE_TTL_S)
+async def _cached_lineage_json(
+    region: str,
+    pipeline: str,
+    domain: Optional[str] = None,
+    include_latest_exec: bool = False,
+    view: str = "data",
+) -> Dict[str, Any]:
+    return await asyncio.to_thread(
+        lineage_lib.get_lineage_json,
+        region=region,
+        pipeline_name=pipeline,
+        domain_name=domain,
+        include_latest_exec=include_latest_exec,
+        view=view,
+    )
+
+@async_ttl_cache(_CACHE_TTL_S)
+async def _cached_feature_groups(region: str) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(list_feature_groups, region=region)
 
 def _parse_regions(regions: Optional[str], profile: Optional[str]) -> List[str]:
     """regions 쿼리가 있으면 그것을 사용, 없으면 SageMaker 지원 모든 리전 반환"""
     if regions:
         return [r.strip() for r in regions.split(",") if r.strip()]
-    sess = boto3.session.Session(profile_name=profile) if profile else boto3.session.Session()
-    return sess.get_available_regions("sagemaker")
+    return get_session(profile).get_available_regions("sagemaker")
 
 def _get_latest_pipeline_execution(sm, pipeline_name: str) -> Dict[str, Any]:
     """최신 파이프라인 실행 1건 요약"""
@@ -93,14 +179,14 @@ def _get_latest_pipeline_execution(sm, pipeline_name: str) -> Dict[str, Any]:
     return {
         "arn": x.get("PipelineExecutionArn"),
         "status": x.get("PipelineExecutionStatus"),
-        "startTime": x.get("StartTime").isoformat() if x.get("StartTime") else None,
-        "lastModifiedTime": x.get("LastUpdatedTime").isoformat() if x.get("LastUpdatedTime") else None
+        # datetime은 ORJSONResponse가 ISO 8601로 직렬화
+        "startTime": x.get("StartTime"),
+        "lastModifiedTime": x.get("LastUpdatedTime"),
     }
 
 def guess_step_from_path(path: str, pipeline: str) -> str:
-    import re, os as _os
-    base = _os.path.basename(path or "")
-    m = re.match(r"(\d+_)?([a-zA-Z0-9\-_]+)", base)
+    base = os.path.basename(path or "")
+    m = _STEP_RE.match(base)
     step = (m.group(2) if m else base).replace(".sql", "").replace(".py", "")
     return step
 
@@ -115,259 +201,292 @@ async def fetch_schema_layer(
 ) -> Dict[str, Any]:
     """
     /lineage/schema 집계 로직:
-      - /lineage → 데이터 관점 그래프에서 dataArtifact 노드 추출
-      - 각 S3 URI에 대해 /datasets/{bucket}/{prefix}/schema 호출
+      - 라인리지(데이터 관점 그래프)에서 dataArtifact 노드 추출
+      - 각 S3 URI에 대해 저장된 데이터셋 스키마 조회
       - (옵션) FeatureStore, SQL 라인리지 보강
       - 프론트가 바로 쓰는 tables/columns/featureGroups/features + links 반환
+    같은 프로세스의 핸들러를 HTTP로 재호출하지 않고 함수로 직접 호출한다.
     """
-    base = str(request.base_url).rstrip("/")
     warnings: List[str] = []
 
-    async with httpx.AsyncClient(base_url=base, timeout=timeout_s) as client:
-        # 1) 라인리지(graphData 확보)
-        r = await client.get("/lineage", params={"pipeline": pipeline, "region": region, "view": "data"})
-        if r.status_code != 200:
-            raise HTTPException(status_code=502, detail=f"lineage fetch failed: {r.text}")
-        lineage = r.json() or {}
-        data_graph = lineage.get("graphData") or {}
-        nodes = data_graph.get("nodes") or []
-
-        # 2) dataArtifact -> S3 URI 매핑
-        artifact_map: Dict[str, str] = {}  # nodeId -> s3://...
-        for dn in (n for n in nodes if n.get("type") == "dataArtifact"):
-            node_id = dn.get("id") or ""
-            # id 규칙이 data:s3://... 인 케이스
-            if node_id.startswith("data:s3://"):
-                s3 = node_id[5:]
-                if is_data_uri(s3):
-                    artifact_map[node_id] = s3
-                continue
-            # uri 필드에서 추출
-            uri = dn.get("uri")
-            if is_data_uri(uri):
-                mapped_id = data_node_id_from_uri(uri)
-                artifact_map[mapped_id] = uri
-
-        # 후보 URI 정리
-        uris = sorted(set(artifact_map.values()))
-
-        # URI가 없어도 계속 진행 (SQL 라인리지에서 테이블 정보 가져올 수 있음)
-        if not uris:
-            warnings.append("no data artifacts found in lineage graph")
-
-        # (선택) 스캔 트리거
-        if scan_if_missing and uris:
-            for u in uris:
-                try:
-                    await client.post(
-                        "/datasets/schema/scan",
-                        params={"region": region, "s3_uri": u},
-                    )
-                except Exception as e:
-                    warnings.append(f"schema scan failed for {u}: {e}")
-
-        # 3) 스키마 fetch with fallback(latest version)
-        async def fetch_dataset_schema(uri: str) -> Dict[str, Any]:
-            try:
-                bucket, prefix = parse_s3_uri(uri)
-                parts = [p for p in prefix.split("/") if p]
-                tried = []
-                # uri에서 상위 폴더로 한 단계씩 올라가며 /schema 조회
-                for i in range(len(parts), 0, -1):
-                    candidate = "/".join(parts[:i])
-                    tried.append(candidate)
-                    res = await client.get(f"/datasets/{bucket}/{candidate}/schema")
-                    if res.status_code == 200:
-                        data = res.json() or {}
-                        # 어떤 prefix에 매칭됐는지 같이 반환
-                        return {
-                            "uri": uri,
-                            "ok": True,
-                            "data": data,
-                            "bucket": bucket,
-                            "matched_prefix": candidate,
-                        }
-                # 마지막으로 제일 상위 prefix도 안 되면 실패
-                return {"uri": uri, "ok": False, "error": f"no schema for {tried}"}
-            except Exception as e:
-                return {"uri": uri, "ok": False, "error": str(e)}
+    async def _call(fn, *args, **kwargs):
+        # 동기(boto3/디스크 I/O) 함수는 스레드풀에서 실행, 호출별 timeout_s 적용
+        # (이벤트 루프에서 블로킹 호출을 직접 하지 않는다)
+        return await asyncio.wait_for(asyncio.to_thread(fn, *args, **kwargs), timeout=timeout_s)
 
-        dataset_results = []
-        if uris:
-            dataset_results = await asyncio.gather(*(fetch_dataset_schema(u) for u in uris))
+    # 1) 라인리지(graphData 확보)
+    try:
+        lineage = await asyncio.wait_for(_cached_lineage_json(region, pipeline), timeout=timeout_s) or {}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"lineage fetch failed: {e}")
+    data_graph = lineage.get("graphData") or {}
+    nodes = data_graph.get("nodes") or []
+
+    # 2) dataArtifact -> S3 URI 매핑
+    artifact_map: Dict[str, str] = {}  # nodeId -> s3://...
+    for dn in nodes:
+        if dn.get("type") != "dataArtifact":
+            continue
+        node_id = dn.get("id") or ""
+        # id 규칙이 data:s3://... 인 케이스
+        if node_id.startswith("data:s3://"):
+            s3 = node_id[5:]
+            if is_data_uri(s3):
+                artifact_map[node_id] = s3
+            continue
+        # uri 필드에서 추출
+        uri = dn.get("uri")
+        if is_data_uri(uri):
+            mapped_id = data_node_id_from_uri(uri)
+            artifact_map[mapped_id] = uri
+
+    # 후보 URI 정리 (중복 제거, 삽입 순서 유지)
+    uris = list(dict.fromkeys(artifact_map.values()))
+
+    # prefix 매칭용 정렬 인덱스 (uri 오름차순) — 같은 prefix를 가진 uri는 연속 구간에 모임
+    sorted_artifacts = sorted((s3, node_id) for node_id, s3 in artifact_map.items())
+    sorted_uris = [s3 for s3, _ in sorted_artifacts]
+
+    # URI가 없어도 계속 진행 (SQL 라인리지에서 테이블 정보 가져올 수 있음)
+    if not uris:
+        warnings.append("no data artifacts found in lineage graph")
+        # 보강할 소스도 없으면 더 조회할 것이 없음
+        if not include_sql and not include_featurestore:
+            return {
+                "tables": [],
+                "columns": [],
+                "featureGroups": [],
+                "features": [],
+                "warnings": warnings,
+            }
+
+    # (선택) 스캔 트리거
+    if scan_if_missing and uris:
+        # URI별 S3 샘플링을 동시에 수행하되, 연결/FD 고갈 방지를 위해 동시성 제한
+        scan_sem = asyncio.Semaphore(_SCHEMA_SCAN_CONCURRENCY)
+
+        async def scan_bounded(u: str):
+            async with scan_sem:
+                return await _call(_scan_dataset_schema_impl, region=region, s3_uri=u)
+
+        scans = await asyncio.gather(*(scan_bounded(u) for u in uris), return_exceptions=True)
+        for u, res in zip(uris, scans):
+            if isinstance(res, BaseException):
+                warnings.append(f"schema scan failed for {u}: {res}")
+
+    # 3) 스키마 fetch with fallback(latest version)
+    #    uri별 상위 prefix 후보 전체를 모아 스토어를 한 번만 조회
+    candidates: Dict[str, Tuple[str, List[str]]] = {}
+    for u in uris:
+        try:
+            bucket, prefix = parse_s3_uri(u)
+        except Exception as e:
+            warnings.append(f"{u}: {e}")
+            continue
+        parts = [p for p in prefix.split("/") if p]
+        candidates[u] = (bucket, ["/".join(parts[:i]) for i in range(len(parts), 0, -1)])
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    if candidates:
+        dsids = list({dataset_id_from_s3(b, c) for b, cands in candidates.values() for c in cands})
+        try:
+            latest = await _call(get_latest_many, dsids)
+        except asyncio.TimeoutError:
+            warnings.append(f"schema store lookup timeout after {timeout_s}s")
+        except Exception as e:
+            warnings.append(f"schema store lookup failed: {e}")
+
+    dataset_results = []
+    for u, (bucket, cands) in candidates.items():
+        # uri에서 상위 폴더로 한 단계씩 올라가며 가장 깊은 prefix의 스키마 선택
+        for candidate in cands:
+            dsid = dataset_id_from_s3(bucket, candidate)
+            rec = latest.get(dsid)
+            if rec:
+                dataset_results.append({
+                    "uri": u,
+                    "ok": True,
+                    "data": {"dataset_id": dsid, "version": rec["version"], "policy": rec["policy"], "schema": rec["schema"]},
+                    "bucket": bucket,
+                    "matched_prefix": candidate,
+                })
+                break
+        else:
+            dataset_results.append({"uri": u, "ok": False, "error": f"no schema for {cands}"})
+
+    # 4) normalize -> tables/columns
+    tables: List[Dict[str, Any]] = []
+    columns: List[Dict[str, Any]] = []
+
+    for res in dataset_results:
+        if not res["ok"]:
+            warnings.append(f"{res['uri']}: {res.get('error')}")
+            continue
+
+        data = res["data"] or {}
+        bucket = res["bucket"]
+        matched_prefix = res["matched_prefix"]
+
+        # dataset_id 없으면 matched_prefix로 구성
+        dataset_id = (
+            data.get("dataset_id")
+            or data.get("id")
+            or f"s3://{bucket}/{matched_prefix}"
+        )
 
-        # 4) normalize -> tables/columns
-        tables: List[Dict[str, Any]] = []
-        columns: List[Dict[str, Any]] = []
+        # table 이름: dataset_id 마지막 토큰 (pipelines::exp1 -> exp1)
+        t_name = dataset_id.rstrip("/").rpartition("::")[2].rpartition("/")[2]
+        t_id = f"table:{t_name}"
+
+        # 이 스키마가 커버하는 data 노드들과 연결
+        links: List[str] = []
+        prefix_uri = f"s3://{bucket}/{matched_prefix}"
+        i = bisect.bisect_left(sorted_uris, prefix_uri)
+        while i < len(sorted_uris) and sorted_uris[i].startswith(prefix_uri):
+            links.append(sorted_artifacts[i][1])
+            i += 1
+        # node_id는 artifact_map 키라 중복이 없고, uri 정렬 순서로 이미 정렬돼 있음
+
+        # links가 없어도 테이블은 추가 (프론트에 표시하기 위해)
+        tables.append({
+            "id": t_id,
+            "name": t_name,
+            "version": data.get("version"),
+            "links": links,
+            "s3_prefix": matched_prefix,  # 디버깅용
+        })
 
-        for res in dataset_results:
-            if not res["ok"]:
-                warnings.append(f"{res['uri']}: {res.get('error')}")
-                continue
+        # ----- 컬럼 추출 -----
+        # 1) columns 배열 형식이 있으면 우선
+        raw_cols = data.get("columns")
 
-            data = res["data"] or {}
-            bucket = res["bucket"]
-            matched_prefix = res["matched_prefix"]
-
-            # dataset_id 없으면 matched_prefix로 구성
-            dataset_id = (
-                data.get("dataset_id")
-                or data.get("id")
-                or f"s3://{bucket}/{matched_prefix}"
-            )
-
-            # table 이름: dataset_id 마지막 토큰 (pipelines::exp1 -> exp1)
-            raw_name = dataset_id.split("::")[-1]
-            t_name = raw_name.rstrip("/").split("/")[-1]
-            t_id = f"table:{t_name}"
-
-            # 이 스키마가 커버하는 data 노드들과 연결
-            links: List[str] = []
-            prefix_uri = f"s3://{bucket}/{matched_prefix}"
-            for node_id, s3 in artifact_map.items():
-                if s3.startswith(prefix_uri):
-                    links.append(node_id)
-            links = sorted(set(links))
-
-            # links가 없어도 테이블은 추가 (프론트에 표시하기 위해)
-            tables.append({
-                "id": t_id,
-                "name": t_name,
-                "version": data.get("version"),
-                "links": links,
-                "s3_prefix": matched_prefix,  # 디버깅용
-            })
-
-            # ----- 컬럼 추출 -----
-            # 1) columns 배열 형식이 있으면 우선
-            raw_cols = data.get("columns")
-
-            # 2) schema.fields 형식 파싱
-            if not raw_cols and isinstance(data.get("schema"), dict):
-                fields = data["schema"].get("fields") or {}
-                raw_cols = []
-                for cname, meta in fields.items():
-                    if cname in ("sampled_files",):
-                        continue
-                    ctype = None
-                    if isinstance(meta, dict):
-                        ts = meta.get("types") or meta.get("type")
-                        if isinstance(ts, list):
-                            ctype = " | ".join(str(t) for t in ts)
-                        else:
-                            ctype = ts
-                    raw_cols.append({"name": cname, "type": ctype})
-
-            for c in raw_cols or []:
-                cname = c.get("name")
-                if not cname:
+        # 2) schema.fields 형식 파싱
+        if not raw_cols and isinstance(data.get("schema"), dict):
+            fields = data["schema"].get("fields") or {}
+            raw_cols = []
+            for cname, meta in fields.items():
+                if cname in ("sampled_files",):
                     continue
-                ctype = c.get("type")
-                columns.append({
-                    "id": f"column:{t_name}.{cname}",
-                    "name": cname,
-                    "tableId": t_id,
-                    "type": ctype,
-                    "links": links,
-                })
+                ctype = None
+                if isinstance(meta, dict):
+                    ts = meta.get("types") or meta.get("type")
+                    if isinstance(ts, list):
+                        ctype = " | ".join(str(t) for t in ts)
+                    else:
+                        ctype = ts
+                raw_cols.append({"name": cname, "type": ctype})
+
+        columns.extend(
+            {
+                "id": f"column:{t_name}.{cname}",
+                "name": cname,
+                "tableId": t_id,
+                "type": c.get("type"),
+                "links": links,
+            }
+            for c in (raw_cols or [])
+            if (cname := c.get("name"))
+        )
 
-        # 5) SQL 라인리지로 테이블 보강 (스키마가 없을 때 중요!)
-        if include_sql:
-            try:
-                sqlr = await client.get(f"/pipelines/{pipeline}/sql-lineage", params={"region": region})
-                if sqlr.status_code == 200:
-                    sql = sqlr.json() or {}
-                    sql_tables = sql.get("steps", [])
-                    # SQL에서 발견된 테이블 추가
-                    for step in sql_tables:
-                        dst = step.get("dst")
-                        if not dst:
-                            continue
-                        t_name = dst.split(".")[-1]  # schema.table -> table
-                        t_id = f"table:{t_name}"
-                        if any(t["id"] == t_id for t in tables):
+    # 5) SQL 라인리지로 테이블 보강 (스키마가 없을 때 중요!)
+    if include_sql:
+        try:
+            sql = await _call(sql_lineage_by_pipeline, pipeline)
+            if sql:
+                sql_tables = sql.get("steps", [])
+                # dst(schema.table -> table) 기준 인덱스 1회 구성 (먼저 나온 step 우선)
+                sql_by_name: Dict[str, Dict[str, Any]] = {}
+                for step in sql_tables:
+                    dst = step.get("dst")
+                    if dst:
+                        sql_by_name.setdefault(dst.rpartition(".")[2], step)
+                tables_by_id = {t["id"]: t for t in tables}
+
+                # 한 번의 순회로 기존 테이블 보강 + SQL에서만 발견된 테이블 추가
+                for t_name, step in sql_by_name.items():
+                    t_id = f"table:{t_name}"
+                    t = tables_by_id.get(t_id)
+                    if t is not None:
+                        t["sql_step"] = step.get("step")
+                        t["sql_file"] = step.get("file")
+                        continue
+                    tables.append({
+                        "id": t_id,
+                        "name": t_name,
+                        "version": None,
+                        "links": [],
+                        "source": "sql",
+                        "step": step.get("step"),
+                    })
+                    for col_name in (step.get("columns") or []):
+                        if not col_name:
                             continue
-                        tables.append({
-                            "id": t_id,
-                            "name": t_name,
-                            "version": None,
+                        columns.append({
+                            "id": f"column:{t_name}.{col_name}",
+                            "name": col_name,
+                            "tableId": t_id,
+                            "type": "unknown",
                             "links": [],
                             "source": "sql",
-                            "step": step.get("step"),
-                        })
-                        for col_name in (step.get("columns") or []):
-                            if not col_name:
-                                continue
-                            columns.append({
-                                "id": f"column:{t_name}.{col_name}",
-                                "name": col_name,
-                                "tableId": t_id,
-                                "type": "unknown",
-                                "links": [],
-                                "source": "sql",
-                            })
-                    # 기존 테이블 정보 보강
-                    sql_tables_map = { t.get("dst"): t for t in sql_tables if t.get("dst") }
-                    for t in tables:
-                        if t.get("source") == "sql":
-                            continue
-                        st = sql_tables_map.get(t["name"])
-                        if st:
-                            t["sql_step"] = st.get("step")
-                            t["sql_file"] = st.get("file")
-            except Exception as e:
-                warnings.append(f"sql lineage: {e}")
-
-        # 6) Feature Store
-        feature_groups: List[Dict[str, Any]] = []
-        features: List[Dict[str, Any]] = []
-        if include_featurestore:
-            try:
-                fg_list = await client.get("/featurestore/feature-groups", params={"region": region})
-                if fg_list.status_code == 200:
-                    for fg in (fg_list.json().get("items", []) or []):
-                        name = fg.get("FeatureGroupName") or fg.get("name")
-                        if not name:
-                            continue
-                        det = await client.get(f"/featurestore/feature-groups/{name}", params={"region": region})
-                        if det.status_code != 200:
-                            continue
-                        detj = det.json() or {}
-                        s3_uri = (detj.get("OfflineStoreConfig") or {}).get("S3StorageConfig", {}).get("ResolvedOutputS3Uri")
-                        links = [data_node_id_from_uri(s3_uri)] if s3_uri and is_data_uri(s3_uri) else []
-                        fg_id = f"featureGroup:{name}"
-                        feature_groups.append({
-                            "id": fg_id,
-                            "name": name,
-                            "version": detj.get("Version") or detj.get("FeatureGroupVersion"),
-                            "links": links,
                         })
-                        for f in (detj.get("FeatureDefinitions") or detj.get("Features") or []):
-                            fname = f.get("FeatureName") or f.get("name")
-                            ftype = f.get("FeatureType") or f.get("type")
-                            if not fname:
-                                continue
-                            features.append({
-                                "id": f"feature:{name}.{fname}",
-                                "name": fname,
-                                "groupId": fg_id,
-                                "type": ftype,
-                                "links": links,
-                            })
-            except Exception as e:
-                warnings.append(f"feature store: {e}")
+        except Exception as e:
+            warnings.append(f"sql lineage: {e}")
+
+    # 6) Feature Store
+    feature_groups: List[Dict[str, Any]] = []
+    features: List[Dict[str, Any]] = []
+    if include_featurestore:
+        try:
+            fg_items = await asyncio.wait_for(_cached_feature_groups(region), timeout=timeout_s) or []
+            names = [n for n in (fg.get("FeatureGroupName") or fg.get("name") for fg in fg_items) if n]
+
+            # describe 호출 동시 실행 (SageMaker API 쿼터 보호를 위해 동시성 제한)
+            fg_sem = asyncio.Semaphore(_FG_DESCRIBE_CONCURRENCY)
+
+            async def describe_bounded(name: str):
+                async with fg_sem:
+                    return await _call(describe_feature_group, region=region, name=name)
+
+            details = await asyncio.gather(*(describe_bounded(n) for n in names), return_exceptions=True)
+            for name, detj in zip(names, details):
+                # 개별 describe 실패는 건너뜀
+                if isinstance(detj, BaseException):
+                    continue
+                detj = detj or {}
+                s3_uri = (detj.get("OfflineStoreConfig") or {}).get("S3StorageConfig", {}).get("ResolvedOutputS3Uri")
+                links = [data_node_id_from_uri(s3_uri)] if s3_uri and is_data_uri(s3_uri) else []
+                fg_id = f"featureGroup:{name}"
+                feature_groups.append({
+                    "id": fg_id,
+                    "name": name,
+                    "version": detj.get("Version") or detj.get("FeatureGroupVersion"),
+                    "links": links,
+                })
+                features.extend(
+                    {
+                        "id": f"feature:{name}.{fname}",
+                        "name": fname,
+                        "groupId": fg_id,
+                        "type": f.get("FeatureType") or f.get("type"),
+                        "links": links,
+                    }
+                    for f in (detj.get("FeatureDefinitions") or detj.get("Features") or [])
+                    if (fname := f.get("FeatureName") or f.get("name"))
+                )
+        except Exception as e:
+            warnings.append(f"feature store: {e}")
 
-        # id 기준으로 중복 제거
-        tables = list({t["id"]: t for t in tables}.values())
-        columns = list({c["id"]: c for c in columns}.values())
+    # id 기준으로 중복 제거
+    tables = list({t["id"]: t for t in tables}.values())
+    columns = list({c["id"]: c for c in columns}.values())
 
-        return {
-            "tables": tables,
-            "columns": columns,
-            "featureGroups": feature_groups,
-            "features": features,
-            "warnings": warnings,
-        }
+    return {
+        "tables": tables,
+        "columns": columns,
+        "featureGroups": feature_groups,
+        "features": features,
+        "warnings": warnings,
+    }
 
 # -----------------------------------------------------------------------------#
 # 0) Health
@@ -434,40 +553,51 @@ def sagemaker_pipelines(
 ):
     try:
         region_list = _parse_regions(regions, profile)
-        out: List[Dict[str, Any]] = []
+        s = name.lower() if name else None
+        dn = domainName.lower() if domainName else None
 
-        for r in region_list:
+        def _scan_region(r: str) -> Dict[str, Any]:
             try:
                 pipes = lineage_lib.list_pipelines_with_domain(region=r, profile=profile)
 
-                if name:
-                    s = name.lower()
-                    pipes = [p for p in pipes if s in p["name"].lower()]
-                if domainName:
-                    dn = domainName.lower()
-                    pipes = [p for p in pipes
-                             if (p.get("matchedDomain") and p["matchedDomain"].get("DomainName","").lower() == dn)
-                             or ((p.get("tags") or {}).get("DomainName","").lower() == dn)]
-                if domainId:
-                    pipes = [
-                        p for p in pipes
-                        if (p.get("matchedDomain") and p["matchedDomain"].get("DomainId") == domainId)
-                        or ((p.get("tags") or {}).get("DomainId") == domainId)
-                    ]
-
-                if includeLatestExec:
-                    sess = boto3.session.Session(profile_name=profile, region_name=r) if profile \
-                        else boto3.session.Session(region_name=r)
-                    sm = sess.client("sagemaker", config=_BOTO_CFG)
+                if name or domainName or domainId:
+                    # 이름/도메인 필터를 한 번의 순회로 적용
+                    kept = []
                     for p in pipes:
+                        md = p.get("matchedDomain") or {}
+                        tg = p.get("tags") or {}
+                        if s and s not in p["name"].lower():
+                            continue
+                        if dn and md.get("DomainName", "").lower() != dn and tg.get("DomainName", "").lower() != dn:
+                            continue
+                        if domainId and md.get("DomainId") != domainId and tg.get("DomainId") != domainId:
+                            continue
+                        kept.append(p)
+                    pipes = kept
+
+                if includeLatestExec and pipes:
+                    # client 생성은 서비스 모델 로딩 비용이 커서 (profile, region) 단위로 재사용 (modules.aws_clients)
+                    sm = get_client("sagemaker", r, profile, _BOTO_CFG)
+
+                    def _latest(p: Dict[str, Any]) -> None:
                         try:
                             p["latestExecution"] = _get_latest_pipeline_execution(sm, p["name"])
                         except Exception:
                             p["latestExecution"] = {}
 
-                out.append({"region": r, "pipelines": pipes})
+                    with ThreadPoolExecutor(max_workers=min(_LATEST_EXEC_CONCURRENCY, len(pipes))) as ex:
+                        list(ex.map(_latest, pipes))
+
+                return {"region": r, "pipelines": pipes}
             except Exception as e:
-                out.append({"region": r, "error": str(e), "pipelines": []})
+                return {"region": r, "error": str(e), "pipelines": []}
+
+        # boto3는 블로킹이므로 리전별 작업을 스레드풀로 동시에 수행 (결과 순서는 region_list 유지)
+        if not region_list:
+            out: List[Dict[str, Any]] = []
+        else:
+            with ThreadPoolExecutor(max_workers=min(_REGION_CONCURRENCY, len(region_list))) as ex:
+                out = list(ex.map(_scan_region, region_list))
 
         return {"regions": out}
 
@@ -487,6 +617,7 @@ def lineage_endpoint(
     view: str = Query("both", regex="^(pipeline|data|both)$", description="pipeline | data | both"),
     ### NEW
     includePII: bool = Query(False, description="Analyzer와 Retention(삭제된 ID 교차점검) 포함"),
+    includeS3Meta: bool = Query(False, description="artifact 버킷 S3 보안 메타 포함"),
 ):
     try:
         data = lineage_lib.get_lineage_json(
@@ -497,6 +628,7 @@ def lineage_endpoint(
             profile=profile,
             view=view,
             include_pii=includePII,
+            include_s3_meta=includeS3Meta,
         )
         return data
     except ValueError as ve:
@@ -510,6 +642,15 @@ def lineage_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail={"type":"ServerError","message":str(e)})
 
+@app.get("/lineage/s3-meta")
+def lineage_s3_meta(
+    region: str = Query(..., description="e.g., ap-northeast-2"),
+    bucket: str = Query(..., description="artifact bucket name"),
+    profile: str | None = Query(None, description="Local dev only; AWS profile name"),
+):
+    # /lineage 에서 includeS3Meta 없이 받은 artifact의 보안 메타를 필요할 때만 조회
+    return lineage_lib.get_artifact_s3_meta(region, bucket, profile)
+
 # -----------------------------------------------------------------------------#
 # 3) 도메인 내 모든 파이프라인 라인리지
 # -----------------------------------------------------------------------------#
@@ -521,6 +662,7 @@ def lineage_by_domain(
     profile: str | None = Query(None),
     view: str = Query("both", regex="^(pipeline|data|both)$"),
     includePII: bool = Query(False, description="Analyzer+Retention 포함"),
+    includeS3Meta: bool = Query(False, description="artifact 버킷 S3 보안 메타 포함"),
 ):
     try:
         pipes = lineage_lib.list_pipelines_with_domain(region=region, profile=profile)
@@ -543,6 +685,7 @@ def lineage_by_domain(
                     profile=profile,
                     view=view,
                     include_pii=includePII,
+                    include_s3_meta=includeS3Meta,
                 )
                 results.append({"pipeline": name, "ok": True, "data": data})
             except Exception as e:
@@ -557,6 +700,21 @@ def lineage_by_domain(
 # -----------------------------------------------------------------------------#
 # 4) Dataset schema endpoints
 # -----------------------------------------------------------------------------#
+def _scan_dataset_schema_impl(region: str, s3_uri: str, max_objects: int = 5, max_bytes: int = 256*1024) -> Dict[str, Any]:
+    sch = sample_schema(region=region, s3_uri=s3_uri, max_objects=max_objects, max_bytes=max_bytes)
+    b, p = parse_s3_uri(s3_uri)
+    dsid = dataset_id_from_s3(b, p)
+    policy = {"region": region, "s3_uri": s3_uri, "max_objects": max_objects, "max_bytes": max_bytes}
+    rec = save_schema(dsid, sch, policy)
+    return {"ok": True, "dataset_id": dsid, "version": rec["version"], "schema": sch}
+
+def _get_dataset_schema_impl(bucket: str, prefix: str, version: int | None = None) -> Optional[Dict[str, Any]]:
+    dsid = dataset_id_from_s3(bucket, prefix)
+    rec = get_version(dsid, version)
+    if not rec:
+        return None
+    return {"dataset_id": dsid, "version": rec["version"], "policy": rec["policy"], "schema": rec["schema"]}
+
 @app.post("/datasets/schema/scan")
 def scan_dataset_schema(
     region: str = Query(..., description="e.g., ap-northeast-2"),
@@ -565,27 +723,20 @@ def scan_dataset_schema(
     max_bytes: int = Query(256*1024, ge=4096, le=5*1024*1024),
 ):
     """S3 prefix에서 샘플을 읽어 JSON/CSV(+Parquet) 스키마 추출 후 버전으로 저장"""
-    sch = sample_schema(region=region, s3_uri=s3_uri, max_objects=max_objects, max_bytes=max_bytes)
-    b, p = parse_s3_uri(s3_uri)
-    dsid = dataset_id_from_s3(b, p)
-    policy = {"region": region, "s3_uri": s3_uri, "max_objects": max_objects, "max_bytes": max_bytes}
-    rec = save_schema(dsid, sch, policy)
-    return {"ok": True, "dataset_id": dsid, "version": rec["version"], "schema": sch}
+    return _scan_dataset_schema_impl(region=region, s3_uri=s3_uri, max_objects=max_objects, max_bytes=max_bytes)
 
 @app.get("/datasets/{bucket}/{prefix:path}/schema")
 def get_dataset_schema(bucket: str, prefix: str, version: int | None = None):
     """저장된 스키마 버전 조회(미지정 시 최신)"""
-    dsid = dataset_id_from_s3(bucket, prefix)
-    rec = get_version(dsid, version)
+    rec = _get_dataset_schema_impl(bucket, prefix, version)
     if not rec:
-        raise HTTPException(404, f"schema not found: {dsid}")
-    return {"dataset_id": dsid, "version": rec["version"], "policy": rec["policy"], "schema": rec["schema"]}
+        raise HTTPException(404, f"schema not found: {dataset_id_from_s3(bucket, prefix)}")
+    return rec
 
 @app.get("/datasets/{bucket}/{prefix:path}/schema/versions")
 def list_dataset_schema_versions(bucket: str, prefix: str):
     dsid = dataset_id_from_s3(bucket, prefix)
-    vers = list_versions(dsid)
-    return [{"version": v["version"], "sampled_at": v["sampled_at"], "policy": v["policy"]} for v in vers]
+    return list_version_summaries(dsid)
 
 # -----------------------------------------------------------------------------#
 # 5) Feature Store helpers
@@ -655,8 +806,8 @@ class XcheckReq(BaseModel):
 
 def _safe_load_json(path: str):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except Exception:
         return None
 
@@ -729,40 +880,42 @@ def _index_s3_usage_from_xcheck(js: dict) -> dict[str, set[str]]:
 
     return index
 
+def _write_json_report(path: str, data: Any) -> None:
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+# async def 핸들러 규칙: 모든 await는 진짜 비동기여야 함
+#   → 블로킹(boto3/디스크 I/O)은 asyncio.to_thread로 감싸고, 순수 블로킹 래퍼는 def로 둔다
 @app.post("/api/v2/scan/rds-auto")
-async def api_v2_scan_rds_auto(req: RdsAutoReq):
+async def api_v2_scan_rds_auto(req: RdsAutoReq, request: Request):
     """
     RDS에서 '삭제된(=보존만료)' ID 목록을 수집하여 로컬 리포트 저장
     """
     url = f"{req.collector_api.rstrip('/')}/api/v2/scan/rds-auto"
     payload = req.model_dump()
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        r = await client.post(url, json=payload)
-        if r.status_code != 200:
-            raise HTTPException(status_code=502, detail=f"collector error: {r.text}")
-        data = r.json()
+    r = await request.app.state.http.post(url, json=payload, timeout=HTTP_TIMEOUTS["rds_auto"])
+    if r.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"collector error: {r.text}")
+    data = orjson.loads(r.content)
     try:
-        with open(RDS_AUTO_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        await asyncio.to_thread(_write_json_report, RDS_AUTO_PATH, data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"save failed: {e}")
     return {"ok": True, "saved": RDS_AUTO_PATH}
 
 @app.post("/api/v2/scan/cross-check")
-async def api_v2_scan_cross_check(req: XcheckReq):
+async def api_v2_scan_cross_check(req: XcheckReq, request: Request):
     """
     S3에서 파일을 훑어 '삭제된 ID' 사용 여부 교차점검 → 로컬 리포트 저장
     """
     url = f"{req.collector_api.rstrip('/')}/api/v2/scan/cross-check"
     payload = req.model_dump()
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        r = await client.post(url, json=payload)
-        if r.status_code != 200:
-            raise HTTPException(status_code=502, detail=f"collector error: {r.text}")
-        data = r.json()
+    r = await request.app.state.http.post(url, json=payload, timeout=HTTP_TIMEOUTS["cross_check"])
+    if r.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"collector error: {r.text}")
+    data = orjson.loads(r.content)
     try:
-        with open(XCHECK_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        await asyncio.to_thread(_write_json_report, XCHECK_PATH, data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"save failed: {e}")
     return {"ok": True, "saved": XCHECK_PATH}
@@ -1,21 +1,31 @@
 # --- file: lineage.py ---
 from __future__ import annotations
 
-import argparse, json, sys, re, datetime as dt, glob, os
+import argparse, sys, re, datetime as dt, glob, os, time, threading, functools, itertools
 from typing import Dict, List, Any, Tuple, Optional
+from collections import Counter
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote as urlquote
 import boto3
 import botocore
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.sql_lineage_store import latest_by_step
+from modules.aws_clients import get_client
 
 # ---------------------------
 # Helpers (refs & S3 parsing)
 # ---------------------------
 
 _REF_RE = re.compile(r"Steps\.([A-Za-z0-9\-_]+)")
-_S3_RE  = re.compile(r"^s3://([^/]+)/?(.*)$")
+
+# 스레드 fan-out(태그 조회 등) 시 커넥션 풀이 병목이 되지 않도록 풀/재시도 확장
+_SM_CFG = Config(max_pool_connections=64, retries={"max_attempts": 10, "mode": "adaptive"})
+_TAG_LOOKUP_CONCURRENCY = int(os.getenv("TAG_LOOKUP_CONCURRENCY", "32"))
 
 def _extract_ref_step(ref: dict | str) -> str | None:
     """{"Get":"Steps.Preprocess...."} -> "Preprocess" 같은 source step 이름 추출"""
@@ -23,30 +33,73 @@ def _extract_ref_step(ref: dict | str) -> str | None:
         ref = ref.get("Get") or ref.get("Std:Ref") or ""
     if not isinstance(ref, str):
         return None
+    # 대부분 "Steps.<Name>...." 형태 → 정규식 없이 슬라이스 (이름 문자 규칙이 맞을 때만)
+    if ref.startswith("Steps."):
+        name = ref[6:].partition(".")[0]
+        bare = name.replace("-", "").replace("_", "")
+        if name and (not bare or (bare.isascii() and bare.isalnum())):
+            return name
     m = _REF_RE.search(ref)
     return m.group(1) if m else None
 
 def _s3_split(uri: str) -> Tuple[Optional[str], Optional[str]]:
+    # uri가 dict(Get/Join 표현식)일 수도 있으므로 캐시 호출 전에 걸러냄 (unhashable)
     if not isinstance(uri, str): return None, None
-    m = _S3_RE.match(uri)
-    if not m: return None, None
-    return m.group(1), m.group(2)  # bucket, key
+    return _s3_split_str(uri)
+
+@functools.lru_cache(maxsize=65536)
+def _s3_split_str(uri: str) -> Tuple[Optional[str], Optional[str]]:
+    if not uri.startswith("s3://") or "\n" in uri: return None, None
+    bucket, _, key = uri[5:].partition("/")
+    if not bucket: return None, None
+    return sys.intern(bucket), key
 
 def _iso(s) -> str:
     return s.isoformat() if hasattr(s, "isoformat") else (str(s) if s is not None else None)
 
+# ---------------------------
+# Client / TTL cache (같은 파이프라인을 수 초 간격으로 반복 조회하는 경우 대비)
+# ---------------------------
+
+_CACHE_TTL_S = float(os.getenv("LINEAGE_CACHE_TTL_S", "30"))
+def _sm_client(region: str, profile: Optional[str] = None):
+    """(region, profile)별 SageMaker client 재사용 (modules.aws_clients 공용 캐시)"""
+    return get_client("sagemaker", region, profile, _SM_CFG)
+
+def _ttl_cache(ttl_s: float):
+    """인자 기준 ttl_s초 메모리 캐시. 빈 결과(실패/미존재)는 캐시하지 않음"""
+    def deco(fn):
+        cache: Dict[Any, Tuple[float, Any]] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+            value = fn(*args, **kwargs)
+            if value:
+                with lock:
+                    if len(cache) >= 256:
+                        for k in [k for k, (exp, _) in cache.items() if exp <= now]:
+                            del cache[k]
+                    cache[key] = (now + ttl_s, value)
+            return value
+        return wrapper
+    return deco
+
 # ---------------------------
 # SageMaker list / pick
 # ---------------------------
 
+_PAGE_SIZE = 100  # list_domains / list_pipelines MaxResults 상한
+
 def list_domains(sm) -> List[Dict[str, Any]]:
-    out, token = [], None
-    while True:
-        resp = sm.list_domains(NextToken=token) if token else sm.list_domains()
-        out.extend(resp.get("Domains", []))
-        token = resp.get("NextToken")
-        if not token: break
-    return out
+    pages = sm.get_paginator("list_domains").paginate(PaginationConfig={"PageSize": _PAGE_SIZE})
+    return [d for page in pages for d in page.get("Domains", [])]
 
 def pick_domain_by_name(domains, name: str) -> Optional[Dict[str, Any]]:
     if not name: return None
@@ -55,14 +108,25 @@ def pick_domain_by_name(domains, name: str) -> Optional[Dict[str, Any]]:
             return d
     return None
 
+def find_domain_by_name(sm, name: str) -> Optional[Dict[str, Any]]:
+    """이름이 일치하는 도메인을 찾는 즉시 반환 (이후 페이지는 조회하지 않음)"""
+    if not name: return None
+    for page in sm.get_paginator("list_domains").paginate(PaginationConfig={"PageSize": _PAGE_SIZE}):
+        for d in page.get("Domains", []):
+            if d.get("DomainName") == name:
+                return d
+    return None
+
 def list_all_pipelines(sm) -> List[Dict[str, Any]]:
-    out, token = [], None
-    while True:
-        resp = sm.list_pipelines(NextToken=token) if token else sm.list_pipelines()
-        out.extend(resp.get("PipelineSummaries", []))
-        token = resp.get("NextToken")
-        if not token: break
-    return out
+    pages = sm.get_paginator("list_pipelines").paginate(PaginationConfig={"PageSize": _PAGE_SIZE})
+    return [p for page in pages for p in page.get("PipelineSummaries", [])]
+
+def _safe_list_tags(sm, arn: str) -> Dict[str, str]:
+    try:
+        tag_list = sm.list_tags(ResourceArn=arn).get("Tags", [])
+    except Exception:
+        tag_list = []
+    return {t["Key"]: t["Value"] for t in tag_list}
 
 def pipeline_has_domain_tag(sm, arn: str, domain_id: Optional[str], domain_name: Optional[str]) -> bool:
     try:
@@ -78,12 +142,19 @@ def pipeline_has_domain_tag(sm, arn: str, domain_id: Optional[str], domain_name:
 # Pipeline definition fetcher (robust)
 # ---------------------------
 
-def get_latest_execution_arn(sm, pipeline_name: str) -> str | None:
+_LATEST_EXEC_TTL_S = float(os.getenv("LATEST_EXEC_TTL_S", "5"))
+
+@_ttl_cache(_LATEST_EXEC_TTL_S)
+def _latest_exec_summary(sm, pipeline_name: str) -> Dict[str, Any]:
+    """최신 실행 요약 1건 — 정의 fallback과 enrich가 같은 조회를 공유 (없으면 빈 dict)"""
     ex = sm.list_pipeline_executions(
         PipelineName=pipeline_name,
         SortBy="CreationTime", SortOrder="Descending", MaxResults=1
-    ).get("PipelineExecutionSummaries", [])
-    return ex[0]["PipelineExecutionArn"] if ex else None
+    ).get("PipelineExecutionSummaries", []) or []
+    return ex[0] if ex else {}
+
+def get_latest_execution_arn(sm, pipeline_name: str) -> str | None:
+    return _latest_exec_summary(sm, pipeline_name).get("PipelineExecutionArn")
 
 def get_pipeline_definition(sm, pipeline_name: str) -> dict:
     """
@@ -93,7 +164,7 @@ def get_pipeline_definition(sm, pipeline_name: str) -> dict:
     def _as_dict(v):
         if isinstance(v, dict): return v
         if isinstance(v, str):
-            try: return json.loads(v)
+            try: return orjson.loads(v)
             except Exception: return {}
         return {}
 
@@ -124,6 +195,32 @@ def get_pipeline_definition(sm, pipeline_name: str) -> dict:
 
     return {}
 
+@_ttl_cache(_CACHE_TTL_S)
+def _cached_domains(region: str, profile: Optional[str]) -> List[Dict[str, Any]]:
+    return list_domains(_sm_client(region, profile))
+
+@_ttl_cache(_CACHE_TTL_S)
+def _cached_domain_by_name(region: str, profile: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+    return find_domain_by_name(_sm_client(region, profile), name)
+
+@_ttl_cache(_CACHE_TTL_S)
+def _cached_pipelines(region: str, profile: Optional[str]) -> List[Dict[str, Any]]:
+    return list_all_pipelines(_sm_client(region, profile))
+
+@_ttl_cache(_CACHE_TTL_S)
+def _cached_describe_pipeline(region: str, profile: Optional[str], pipeline_name: str) -> Dict[str, Any]:
+    """이름으로 파이프라인 1건 조회 (없으면 빈 dict)"""
+    try:
+        return _sm_client(region, profile).describe_pipeline(PipelineName=pipeline_name)
+    except botocore.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("ResourceNotFound", "ValidationException"):
+            return {}
+        raise
+
+@_ttl_cache(_CACHE_TTL_S)
+def _cached_pipeline_definition(region: str, profile: Optional[str], pipeline_name: str) -> dict:
+    return get_pipeline_definition(_sm_client(region, profile), pipeline_name)
+
 # ---------------------------
 # Step IO normalization
 # ---------------------------
@@ -238,35 +335,50 @@ def build_graph_from_definition(pdef: Dict[str, Any]) -> Dict[str, Any]:
 # Build DATA-centric graph (bipartite: process <-> data)
 # ---------------------------
 
-def build_data_view_graph(graph_pipeline: Dict[str, Any]) -> Dict[str, Any]:
+def build_data_view_graph(graph_pipeline: Dict[str, Any], ref_artifacts: bool = False) -> Dict[str, Any]:
     """
     pipeline 그래프(graph_pipeline: nodes/edges/artifacts)를 이용해
     데이터-중심 이분 그래프를 생성한다.
+    ref_artifacts=True 이면 data 노드에 메타(s3/bucket/key)를 복사하지 않고
+    graph_pipeline.artifacts의 id(artifactId)만 참조한다 (같은 응답에 artifacts가 함께 나갈 때).
     """
     nodes_p = graph_pipeline.get("nodes", [])
     artifacts = graph_pipeline.get("artifacts", [])
 
+    # artifact 메타 인덱스 (uri -> 첫 artifact) — data 노드마다 artifacts 전체를 훑지 않도록 1회 구성
+    art_by_uri: Dict[str, Dict[str, Any]] = {}
+    for a in artifacts:
+        art_by_uri.setdefault(a.get("uri"), a)
+
     # 1) data 노드 인덱스 (uri -> node)
     data_nodes: Dict[str, Dict[str, Any]] = {}
+    node_by_raw_uri: Dict[str, Dict[str, Any]] = {}  # 같은 원본 uri의 정규화(lower/rstrip) 반복 방지
     def ensure_data_node(uri: str) -> Dict[str, Any]:
+        node = node_by_raw_uri.get(uri)
+        if node is not None:
+            return node
         uid = f"data:{uri.lower().rstrip('/')}"
-        if uid not in data_nodes:
-            meta = {}
-            for a in artifacts:
-                if a.get("uri") == uri:
-                    if a.get("s3"):
-                        meta["s3"] = a["s3"]
-                    meta["bucket"] = a.get("bucket")
-                    meta["key"] = a.get("key")
-                    break
-            data_nodes[uid] = {
+        node = data_nodes.get(uid)
+        if node is None:
+            a = art_by_uri.get(uri)
+            node = data_nodes[uid] = {
                 "id": uid,
                 "type": "dataArtifact",
                 "label": uri,
                 "uri": uri,
-                "meta": meta
             }
-        return data_nodes[uid]
+            if a is not None:
+                node["artifactId"] = a.get("id")
+            if not ref_artifacts:
+                meta = {}
+                if a is not None:
+                    if a.get("s3"):
+                        meta["s3"] = a["s3"]
+                    meta["bucket"] = a.get("bucket")
+                    meta["key"] = a.get("key")
+                node["meta"] = meta
+        node_by_raw_uri[uri] = node
+        return node
 
     # 2) process 노드 구성
     proc_nodes: List[Dict[str, Any]] = []
@@ -312,20 +424,46 @@ def build_data_view_graph(graph_pipeline: Dict[str, Any]) -> Dict[str, Any]:
 # Enrich: latest execution (run info, metrics, registry)
 # ---------------------------
 
+_DESCRIBE_JOB_CONCURRENCY = int(os.getenv("DESCRIBE_JOB_CONCURRENCY", "16"))
+
 def enrich_with_latest_execution(sm, pipeline_name: str, graph: Dict[str, Any]) -> None:
     try:
-        ex_summ = sm.list_pipeline_executions(
-            PipelineName=pipeline_name, SortBy="CreationTime", SortOrder="Descending", MaxResults=1
-        ).get("PipelineExecutionSummaries", []) or []
-        if not ex_summ:
-            return
-        exec_arn = ex_summ[0].get("PipelineExecutionArn")
+        exec_arn = get_latest_execution_arn(sm, pipeline_name)
         if not exec_arn:
             return
 
         steps = sm.list_pipeline_execution_steps(PipelineExecutionArn=exec_arn).get("PipelineExecutionSteps", []) or []
         node_map = {n.get("id"): n for n in graph.get("nodes", []) if n.get("id")}
 
+        # describe 대상 job을 먼저 모아 스레드풀로 동시 조회 (step 수만큼의 직렬 왕복 방지)
+        jobs: List[Tuple[str, str]] = []
+        for st in steps:
+            if st.get("StepName") not in node_map:
+                continue
+            meta = st.get("Metadata") or {}
+            pjob_arn = (meta.get("ProcessingJob") or {}).get("Arn")
+            if pjob_arn:
+                jobs.append(("processing", pjob_arn.split("/")[-1]))
+            tjob_arn = (meta.get("TrainingJob") or {}).get("Arn")
+            if tjob_arn:
+                jobs.append(("training", tjob_arn.split("/")[-1]))
+        jobs = list(dict.fromkeys(jobs))
+
+        def _describe(job: Tuple[str, str]):
+            kind, job_name = job
+            try:
+                if kind == "processing":
+                    return sm.describe_processing_job(ProcessingJobName=job_name)
+                return sm.describe_training_job(TrainingJobName=job_name)
+            except Exception as e:
+                # 적용 시점에 다시 raise → 기존과 같이 enrich 전체 중단
+                return e
+
+        described: Dict[Tuple[str, str], Any] = {}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(_DESCRIBE_JOB_CONCURRENCY, len(jobs))) as ex:
+                described = dict(zip(jobs, ex.map(_describe, jobs)))
+
         for st in steps:
             name = st.get("StepName")
             node = node_map.get(name)
@@ -349,8 +487,9 @@ def enrich_with_latest_execution(sm, pipeline_name: str, graph: Dict[str, Any])
             # Processing
             pjob_arn = (meta.get("ProcessingJob") or {}).get("Arn")
             if pjob_arn:
-                pj_name = pjob_arn.split("/")[-1]
-                dj = sm.describe_processing_job(ProcessingJobName=pj_name)
+                dj = described[("processing", pjob_arn.split("/")[-1])]
+                if isinstance(dj, Exception):
+                    raise dj
                 node["run"]["jobArn"]  = dj.get("ProcessingJobArn")
                 node["run"]["jobName"] = dj.get("ProcessingJobName")
                 inps, outs = [], []
@@ -368,8 +507,9 @@ def enrich_with_latest_execution(sm, pipeline_name: str, graph: Dict[str, Any])
             # Training
             tjob_arn = (meta.get("TrainingJob") or {}).get("Arn")
             if tjob_arn:
-                tj_name = tjob_arn.split("/")[-1]
-                dj = sm.describe_training_job(TrainingJobName=tj_name)
+                dj = described[("training", tjob_arn.split("/")[-1])]
+                if isinstance(dj, Exception):
+                    raise dj
                 node["run"]["jobArn"]  = dj.get("TrainingJobArn")
                 node["run"]["jobName"] = dj.get("TrainingJobName")
 
@@ -398,17 +538,17 @@ def enrich_with_latest_execution(sm, pipeline_name: str, graph: Dict[str, Any])
                 node.setdefault("registry", {})["modelPackageArn"] = model_pkg_arn
 
         # artifacts 재계산
-        seen, artifacts = set(), []
-        aid = 0
-        for n in graph["nodes"]:
-            for item in n.get("inputs", []) + n.get("outputs", []):
-                u = item.get("uri")
-                if isinstance(u, str) and u and u not in seen:
-                    seen.add(u)
-                    b, k = _s3_split(u)
-                    artifacts.append({"id": aid, "uri": u, "bucket": b, "key": k})
-                    aid += 1
-        graph["artifacts"] = artifacts
+        # (노드별 inputs+outputs 리스트 결합 없이 chain으로 순회, dict.fromkeys로 순서 유지 dedupe)
+        uris = dict.fromkeys(
+            u for n in graph["nodes"]
+            for item in itertools.chain(n.get("inputs", ()), n.get("outputs", ()))
+            if isinstance(u := item.get("uri"), str) and u
+        )
+        graph["artifacts"] = [
+            {"id": aid, "uri": u, "bucket": b, "key": k}
+            for aid, u in enumerate(uris)
+            for b, k in (_s3_split(u),)
+        ]
 
     except Exception as e:
         print(f"[warn] enrich failed: {e}", file=sys.stderr)
@@ -421,22 +561,23 @@ def dedupe_and_label_edges(graph: Dict[str, Any]) -> None:
     seen = set()
     new_edges = []
 
-    # to-node 기준 입력 이름 수집
-    input_names: Dict[str, List[str]] = {}
+    # to-node 기준 라벨(입력 이름 상위 2개)을 노드당 1회만 계산
+    label_by_target: Dict[str, str] = {}
     for n in graph["nodes"]:
-        n_ins = [i.get("name") for i in n.get("inputs", []) if i.get("name")]
-        if n_ins:
-            input_names[n["id"]] = n_ins
+        names = {
+            x for x in (i.get("name") for i in n.get("inputs", []))
+            if x and x != "code" and not str(x).startswith("input-")
+        }
+        if names:
+            label_by_target[n["id"]] = ", ".join(sorted(names)[:2])
 
     for e in graph["edges"]:
         key = (e["from"], e["to"], e.get("via"))
         if key in seen:
             continue
         seen.add(key)
-        names = input_names.get(e["to"], [])
-        names = [x for x in names if x != "code" and not str(x).startswith("input-")]
-        if names:
-            e["label"] = ", ".join(sorted(set(names))[:2])
+        if lbl := label_by_target.get(e["to"]):
+            e["label"] = lbl
         new_edges.append(e)
 
     graph["edges"] = new_edges
@@ -445,33 +586,46 @@ def dedupe_and_label_edges(graph: Dict[str, Any]) -> None:
 # (2) Pipeline summary
 # ---------------------------
 
+def _parse_iso(s) -> Optional[dt.datetime]:
+    if isinstance(s, dt.datetime):
+        return s
+    try:
+        s = str(s)
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        return dt.datetime.fromisoformat(s)
+    except Exception:
+        return None
+
 def pipeline_summary(graph: Dict[str, Any]) -> Dict[str, Any]:
     nodes = graph.get("nodes", [])
-    status_counts: Dict[str, int] = {}
-    starts, ends = [], []
+    status_counts: Counter = Counter()
+    min_start: Optional[dt.datetime] = None
+    max_end: Optional[dt.datetime] = None
     for n in nodes:
-        st = ((n.get("run") or {}).get("status") or "Unknown")
-        status_counts[st] = status_counts.get(st, 0) + 1
-        s = (n.get("run") or {}).get("startTime")
-        e = (n.get("run") or {}).get("endTime")
-        if s:
-            try: starts.append(dt.datetime.fromisoformat(str(s).replace("Z","+00:00")))
-            except Exception: pass
-        if e:
-            try: ends.append(dt.datetime.fromisoformat(str(e).replace("Z","+00:00")))
-            except Exception: pass
+        run = n.get("run") or {}
+        status_counts[run.get("status") or "Unknown"] += 1
+        s = run.get("startTime")
+        e = run.get("endTime")
+        if s and (t := _parse_iso(s)) is not None and (min_start is None or t < min_start):
+            min_start = t
+        if e and (t := _parse_iso(e)) is not None and (max_end is None or t > max_end):
+            max_end = t
     total = None
-    if starts and ends:
-        total = int((max(ends) - min(starts)).total_seconds())
+    if min_start is not None and max_end is not None:
+        total = int((max_end - min_start).total_seconds())
     overall = ("Failed" if status_counts.get("Failed") else
                "Executing" if status_counts.get("Executing") else
                "Succeeded" if status_counts.get("Succeeded") else "Unknown")
-    return {"overallStatus": overall, "nodeStatus": status_counts, "elapsedSec": total}
+    return {"overallStatus": overall, "nodeStatus": dict(status_counts), "elapsedSec": total}
 
 # ---------------------------
 # (3) Evaluate report metrics from S3 (best-effort)
 # ---------------------------
 
+# 평가 리포트는 보통 수 KB → 이보다 큰 객체는 리포트가 아닌 것으로 보고 본문을 읽지 않음
+_EVAL_REPORT_MAX_BYTES = int(os.getenv("EVAL_REPORT_MAX_BYTES", str(8 * 1024 * 1024)))
+
 def enrich_eval_metrics_from_s3(session: boto3.session.Session, graph: Dict[str, Any]) -> None:
     s3 = session.client("s3")
     candidates = ("report.json", "evaluation.json", "metrics.json")
@@ -487,12 +641,30 @@ def enrich_eval_metrics_from_s3(session: boto3.session.Session, graph: Dict[str,
             try_keys = []
             if k.endswith(".json"):
                 try_keys.append(k)
-            for c in candidates:
-                try_keys.append(k.rstrip("/") + "/" + c)
+            prefix = k.rstrip("/") + "/"
+            cand_keys = [prefix + c for c in candidates]
+            try:
+                # 후보 파일을 무작정 GET(대부분 404)하지 않고, 바로 아래 객체 목록 1회로 실제 존재하는 것만 선택
+                # 1000건 초과 prefix도 놓치지 않도록 페이지를 넘기되, 키는 사전순으로 나오므로
+                # 후보를 모두 찾았거나 마지막 후보 키를 지나면 중단
+                wanted, last_cand, existing = set(cand_keys), max(cand_keys), set()
+                pages = s3.get_paginator("list_objects_v2").paginate(Bucket=b, Prefix=prefix, Delimiter="/")
+                for page in pages:
+                    keys = [c.get("Key") for c in page.get("Contents", [])]
+                    existing.update(wanted.intersection(keys))
+                    if existing == wanted or (keys and keys[-1] >= last_cand):
+                        break
+                try_keys.extend(ck for ck in cand_keys if ck in existing)
+            except botocore.exceptions.ClientError:
+                # ListBucket 권한이 없으면 기존처럼 후보 키를 순서대로 GET
+                try_keys.extend(cand_keys)
             for key in try_keys:
                 try:
                     obj = s3.get_object(Bucket=b, Key=key)
-                    data = json.loads(obj["Body"].read())
+                    if obj.get("ContentLength", 0) > _EVAL_REPORT_MAX_BYTES:
+                        obj["Body"].close()
+                        continue
+                    data = orjson.loads(obj["Body"].read())
                     base = data.get("metrics") if isinstance(data, dict) else None
                     src = base if isinstance(base, dict) else data
                     if isinstance(src, dict):
@@ -510,58 +682,81 @@ def enrich_eval_metrics_from_s3(session: boto3.session.Session, graph: Dict[str,
 # (4) S3 security metadata enrichment
 # ---------------------------
 
+_S3_META_CONCURRENCY = int(os.getenv("S3_META_CONCURRENCY", "16"))
+
+def _bucket_meta(s3, b: str) -> Dict[str, Any]:
+    meta = {"bucket": b}
+    try:
+        r = s3.get_bucket_location(Bucket=b)
+        meta["region"] = r.get("LocationConstraint") or "us-east-1"
+    except Exception:
+        meta["region"] = "Unknown"
+    try:
+        r = s3.get_bucket_encryption(Bucket=b)
+        rules = r["ServerSideEncryptionConfiguration"]["Rules"]
+        meta["encryption"] = rules[0]["ApplyServerSideEncryptionByDefault"]["SSEAlgorithm"]
+    except Exception:
+        meta["encryption"] = "Unknown"
+    try:
+        r = s3.get_bucket_versioning(Bucket=b)
+        meta["versioning"] = r.get("Status","Disabled")
+    except Exception:
+        meta["versioning"] = "Unknown"
+    try:
+        r = s3.get_public_access_block(Bucket=b)
+        cfg = r["PublicAccessBlockConfiguration"]
+        meta["publicAccess"] = "Blocked" if all(cfg.values()) else "Partial"
+    except Exception:
+        meta["publicAccess"] = "Unknown"
+    try:
+        r = s3.get_bucket_tagging(Bucket=b)
+        tags = {t["Key"]: t["Value"] for t in r.get("TagSet", [])}
+        if tags: meta["tags"] = tags
+    except Exception:
+        pass
+    return meta
+
 def enrich_artifact_s3_meta(artifacts: List[Dict[str,Any]], session: boto3.session.Session):
+    # 버킷 메타는 artifact가 아니라 버킷 단위 → 고유 버킷만 1회씩, 동시에 조회
+    buckets = list(dict.fromkeys(a["bucket"] for a in artifacts if a.get("bucket")))
+    if not buckets:
+        return
     s3 = session.client("s3")
+    with ThreadPoolExecutor(max_workers=min(_S3_META_CONCURRENCY, len(buckets))) as ex:
+        meta_by_bucket = dict(zip(buckets, ex.map(lambda b: _bucket_meta(s3, b), buckets)))
     for a in artifacts:
         b = a.get("bucket")
-        if not b:
-            continue
-        meta = {"bucket": b}
-        try:
-            r = s3.get_bucket_location(Bucket=b)
-            meta["region"] = r.get("LocationConstraint") or "us-east-1"
-        except Exception:
-            meta["region"] = "Unknown"
-        try:
-            r = s3.get_bucket_encryption(Bucket=b)
-            rules = r["ServerSideEncryptionConfiguration"]["Rules"]
-            meta["encryption"] = rules[0]["ApplyServerSideEncryptionByDefault"]["SSEAlgorithm"]
-        except Exception:
-            meta["encryption"] = "Unknown"
-        try:
-            r = s3.get_bucket_versioning(Bucket=b)
-            meta["versioning"] = r.get("Status","Disabled")
-        except Exception:
-            meta["versioning"] = "Unknown"
-        try:
-            r = s3.get_public_access_block(Bucket=b)
-            cfg = r["PublicAccessBlockConfiguration"]
-            meta["publicAccess"] = "Blocked" if all(cfg.values()) else "Partial"
-        except Exception:
-            meta["publicAccess"] = "Unknown"
-        try:
-            r = s3.get_bucket_tagging(Bucket=b)
-            tags = {t["Key"]: t["Value"] for t in r.get("TagSet", [])}
-            if tags: meta["tags"] = tags
-        except Exception:
-            pass
-        a["s3"] = meta
+        if b:
+            a["s3"] = dict(meta_by_bucket[b])
+
+@_ttl_cache(_CACHE_TTL_S)
+def get_artifact_s3_meta(region: str, bucket: str, profile: Optional[str] = None) -> Dict[str, Any]:
+    """보안 패널 등에서 필요할 때만 버킷 1개의 S3 메타를 조회 (라인리지 본 조회에서 분리)"""
+    return _bucket_meta(get_client("s3", region, profile), bucket)
 
 # ---------------------------
 # (5) Analyzer (PII) enrichment
 # ---------------------------
 
 _ANALYZER_API = os.getenv("ANALYZER_API", "http://43.202.228.52:9000")
+_ANALYZER_PROBE_CONCURRENCY = int(os.getenv("ANALYZER_PROBE_CONCURRENCY", "16"))
+
+# Analyzer 조회용 공용 세션 (노드마다 새 TCP 연결을 맺지 않도록 커넥션 풀 재사용)
+#   - 5xx 일시 장애만 짧게 재시도, 연결 실패는 재시도하지 않음(프로브 지연 누적 방지)
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, connect=0, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+))
+_HTTP.mount("https://", _HTTP.get_adapter("http://"))
 
 def _to_analyzer_source_key(s3_uri: str) -> Optional[str]:
     """
     Analyzer가 결과를 저장할 때 자주 쓰는 경로 포맷 's3/<bucket>/<key>' 로 변환
     (results_front_by_source.json 기준)
     """
-    m = re.match(r"^s3://([^/]+)/?(.*)$", s3_uri or "")
-    if not m:
-        return None
-    bucket, key = m.group(1), m.group(2)
+    bucket, key = _s3_split(s3_uri)
     if not bucket or not key:
         return None
     return f"s3/{bucket}/{key}"
@@ -573,7 +768,7 @@ def _probe_analyzer_entities_by_source(source_key: str, timeout: float = 5.0) ->
     """
     url = f"{_ANALYZER_API}/api/result/front-source/{urlquote(source_key, safe='')}/entities"
     try:
-        r = requests.get(url, timeout=timeout)
+        r = _HTTP.get(url, timeout=timeout)
         if r.status_code == 200:
             data = r.json()
             # 기대형태 예: {"entities": {"EMAIL_ADDRESS":{"count":40,...}, ...}, "category":"public", ...}
@@ -589,7 +784,7 @@ def _fallback_probe_analyzer_front_list(s3_uri: str, timeout: float = 5.0) -> Op
     """
     url = f"{_ANALYZER_API}/api/result/front-list?has_entities=any&page=1&size=200"
     try:
-        r = requests.get(url, timeout=timeout)
+        r = _HTTP.get(url, timeout=timeout)
         if r.status_code != 200:
             return None
         js = r.json()
@@ -641,41 +836,49 @@ def _classify_category_from_analyzer_payload(payload: Dict[str, Any]) -> Tuple[b
         category = "none"
     return has, category, ents
 
+def _pii_flags_for_uri(uri: str) -> Dict[str, Any]:
+    """S3 URI 1건에 대해 Analyzer 조회(1차 front-source → 2차 front-list 폴백) 후 pii 필드 구성"""
+    source_key = _to_analyzer_source_key(uri)
+    payload = None
+    detail_url = None
+
+    # 1차: front-source/{SOURCE}/entities
+    if source_key:
+        p = _probe_analyzer_entities_by_source(source_key)
+        if p and p.get("ok"):
+            payload = (p.get("data") or {})
+            detail_url = p.get("detailUrl")
+
+    # 2차 폴백: front-list 조회
+    if payload is None:
+        p = _fallback_probe_analyzer_front_list(uri)
+        if p and p.get("ok"):
+            payload = (p.get("data") or {})
+            if not detail_url:
+                detail_url = p.get("detailUrl")
+
+    has, category, counts = _classify_category_from_analyzer_payload(payload or {})
+    return {
+        "hasPII": has,
+        "category": category,                 # public | sensitive | identifiers | none
+        "counts": counts,                     # 엔티티별 합계
+        "detailUrl": detail_url,              # Analyzer에서 더 자세히 볼 수 있는 호출 URL
+    }
+
 def enrich_artifacts_with_pii_flags(artifacts: List[Dict[str, Any]]) -> None:
     """
     artifacts[*]에 pii 필드 추가:
       pii: { "hasPII": bool, "category": str, "counts": {...}, "detailUrl": str }
+    URI별 Analyzer 조회는 서로 독립적이므로 스레드풀로 동시에 수행 (같은 URI는 1회만 조회)
     """
-    for a in artifacts:
-        uri = a.get("uri")
-        if not isinstance(uri, str) or not uri.startswith("s3://"):
-            continue
-        source_key = _to_analyzer_source_key(uri)
-        payload = None
-        detail_url = None
-
-        # 1차: front-source/{SOURCE}/entities
-        if source_key:
-            p = _probe_analyzer_entities_by_source(source_key)
-            if p and p.get("ok"):
-                payload = (p.get("data") or {})
-                detail_url = p.get("detailUrl")
-
-        # 2차 폴백: front-list 조회
-        if payload is None:
-            p = _fallback_probe_analyzer_front_list(uri)
-            if p and p.get("ok"):
-                payload = (p.get("data") or {})
-                if not detail_url:
-                    detail_url = p.get("detailUrl")
-
-        has, category, counts = _classify_category_from_analyzer_payload(payload or {})
-        a["pii"] = {
-            "hasPII": has,
-            "category": category,                 # public | sensitive | identifiers | none
-            "counts": counts,                     # 엔티티별 합계
-            "detailUrl": detail_url,              # Analyzer에서 더 자세히 볼 수 있는 호출 URL
-        }
+    targets = [a for a in artifacts if isinstance(a.get("uri"), str) and a["uri"].startswith("s3://")]
+    if not targets:
+        return
+    uris = list(dict.fromkeys(a["uri"] for a in targets))
+    with ThreadPoolExecutor(max_workers=min(_ANALYZER_PROBE_CONCURRENCY, len(uris))) as ex:
+        flags = dict(zip(uris, ex.map(_pii_flags_for_uri, uris)))
+    for a in targets:
+        a["pii"] = dict(flags[a["uri"]])
 
 # ---------------------------
 # (6) Retention (보존기간 만료) enrichment
@@ -687,8 +890,8 @@ _RETENTION_MAX_IDS_PREVIEW = int(os.getenv("RETENTION_MAX_IDS_PREVIEW", "10"))
 
 def _safe_load_json(path: str):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except Exception:
         return None
 
@@ -821,9 +1024,7 @@ def list_pipelines_with_domain(region: str, profile: Optional[str] = None) -> Li
     """
     리전 내 파이프라인 + 태그를 함께 반환
     """
-    if profile:
-        boto3.setup_default_session(profile_name=profile, region_name=region)
-    sm = boto3.client("sagemaker", region_name=region)
+    sm = _sm_client(region, profile)
 
     def _domain_id_from_arn(arn: str) -> Optional[str]:
         try:
@@ -832,18 +1033,19 @@ def list_pipelines_with_domain(region: str, profile: Optional[str] = None) -> Li
         except Exception:
             return None
 
-    pipes = list_all_pipelines(sm)
-    doms = { d["DomainId"]: d for d in list_domains(sm) }
+    pipes = _cached_pipelines(region, profile)
+    doms = { d["DomainId"]: d for d in _cached_domains(region, profile) }
     doms_by_name = { d.get("DomainName"): d for d in doms.values() if d.get("DomainName") }
 
+    # 파이프라인별 list_tags는 서로 독립적인 I/O → 스레드풀로 동시 조회 (N+1 직렬 호출 방지)
+    tag_maps: List[Dict[str, str]] = []
+    if pipes:
+        with ThreadPoolExecutor(max_workers=min(_TAG_LOOKUP_CONCURRENCY, len(pipes))) as ex:
+            tag_maps = list(ex.map(lambda p: _safe_list_tags(sm, p["PipelineArn"]), pipes))
+
     out: List[Dict[str, Any]] = []
-    for p in pipes:
+    for p, kv in zip(pipes, tag_maps):
         arn = p["PipelineArn"]
-        try:
-            tag_list = sm.list_tags(ResourceArn=arn).get("Tags", [])
-        except Exception:
-            tag_list = []
-        kv = {t["Key"]: t["Value"] for t in tag_list}
 
         dom = None
         if "DomainId" in kv and kv["DomainId"] in doms:
@@ -881,34 +1083,30 @@ def get_lineage_json(
     view: str = "both",  # "pipeline" | "data" | "both"
     ### NEW
     include_pii: bool = False,
+    include_s3_meta: bool = False,
 ) -> Dict[str, Any]:
     """
     단건 파이프라인의 라인리지 그래프 데이터를 생성
     """
     # 세션 설정
-    if profile:
-        boto3.setup_default_session(profile_name=profile, region_name=region)
-    sm = boto3.client("sagemaker", region_name=region)
+    sm = _sm_client(region, profile)
     session = boto3.session.Session(profile_name=profile, region_name=region)
 
-    # (1) 도메인 조회(선택)
-    domains = list_domains(sm)
-    selected = pick_domain_by_name(domains, domain_name) if domain_name else None
+    # (1) 도메인 조회(선택) — domain_name이 없으면 도메인 API 자체를 호출하지 않음
+    selected = _cached_domain_by_name(region, profile, domain_name) if domain_name else None
     domain_id = selected.get("DomainId") if selected else None
 
-    # (2) 파이프라인 찾기 (+도메인 태그 필터)
-    pipelines = list_all_pipelines(sm)
+    # (2) 파이프라인 찾기 (+도메인 태그 필터) — 이름을 알고 있으므로 전체 목록 대신 단건 조회
     target = None
-    for p in pipelines:
-        if p["PipelineName"] == pipeline_name:
-            if not domain_id or pipeline_has_domain_tag(sm, p["PipelineArn"], domain_id, domain_name):
-                target = p
-                break
+    desc = _cached_describe_pipeline(region, profile, pipeline_name)
+    if desc.get("PipelineArn"):
+        if not domain_id or pipeline_has_domain_tag(sm, desc["PipelineArn"], domain_id, domain_name):
+            target = desc
     if not target:
         raise ValueError(f"Pipeline '{pipeline_name}' not found or not tagged for the given domain.")
 
     # (3) 정의 → 그래프 구성 (먼저 pdef부터!)
-    pdef = get_pipeline_definition(sm, pipeline_name)
+    pdef = _cached_pipeline_definition(region, profile, pipeline_name)
     if not pdef or not any(
         (pdef.get("Steps"),
          (pdef.get("PipelineDefinition") or {}).get("Steps"),
@@ -926,7 +1124,9 @@ def get_lineage_json(
         enrich_eval_metrics_from_s3(session, graph_pipeline)
     except Exception:
         pass
-    enrich_artifact_s3_meta(graph_pipeline["artifacts"], session)
+    # 버킷당 S3 API 5회 → 필요한 경우에만 (그 외에는 get_artifact_s3_meta로 개별 조회)
+    if include_s3_meta:
+        enrich_artifact_s3_meta(graph_pipeline["artifacts"], session)
 
     ### NEW: 여기서 PII + Retention 플래그 보강
     if include_pii:
@@ -949,7 +1149,9 @@ def get_lineage_json(
     summary = pipeline_summary(graph_pipeline)
 
     # (3-3) 데이터-뷰 그래프 (요청 시)
-    graph_data = build_data_view_graph(graph_pipeline) if view in ("data", "both") else None
+    # both: artifacts 메타는 graphPipeline에만 싣고 data 노드는 artifactId로 참조 (페이로드 중복 방지)
+    graph_data = build_data_view_graph(graph_pipeline, ref_artifacts=(view == "both")) \
+        if view in ("data", "both") else None
 
     result = {
         "domain": (selected or {}),
@@ -962,7 +1164,6 @@ def get_lineage_json(
     }
     if view in ("pipeline", "both"):
         result["graphPipeline"] = graph_pipeline
-        result["graph"] = graph_pipeline
     if view in ("data", "both"):
         result["graphData"] = graph_data
 
@@ -1001,6 +1202,7 @@ def main():
     ap.add_argument("--view", choices=["pipeline","data","both"], default="both")
     ap.add_argument("--out", help="JSON 파일로 저장 경로(선택)")
     ap.add_argument("--include-pii", action="store_true", help="Analyzer/Retention 보강 포함")
+    ap.add_argument("--include-s3-meta", action="store_true", help="artifact 버킷 S3 보안 메타 보강 포함")
     args = ap.parse_args()
 
     data = get_lineage_json(
@@ -1011,15 +1213,16 @@ def main():
         profile=args.profile,
         view=args.view,
         include_pii=args.include_pii,
+        include_s3_meta=args.include_s3_meta,
     )
 
-    text = json.dumps(data, indent=2, ensure_ascii=False)
+    raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
     if args.out:
-        with open(args.out, "w", encoding="utf-8") as f:
-            f.write(text)
+        with open(args.out, "wb") as f:
+            f.write(raw)
         print(f"[ok] saved: {args.out}")
     else:
-        print(text)
+        print(raw.decode())
 
 if __name__ == "__main__":
     main()
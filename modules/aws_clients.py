@@ -0,0 +1,40 @@
+# modules/aws_clients.py
+from __future__ import annotations
+import threading
+from typing import Dict, Any, Optional, Tuple
+import boto3
+
+# boto3 Session/Client 공용 캐시
+#  - Session 생성/Session.client() 호출은 스레드 세이프하지 않음 → 전역 락 안에서만 수행
+#    (boto3.client()의 기본 Session 공유 시 간헐적 KeyError: 'credential_provider' 등)
+#  - 생성된 client 자체는 스레드 세이프 → (service, region, profile, config) 단위로 재사용
+#  - config는 객체 identity로 구분 (모듈 상수로 넘기는 것을 전제)
+
+_LOCK = threading.Lock()
+_SESSIONS: Dict[Optional[str], boto3.session.Session] = {}
+_CLIENTS: Dict[Tuple[str, Optional[str], Optional[str], Any], Any] = {}
+
+def _session_locked(profile: Optional[str]) -> boto3.session.Session:
+    sess = _SESSIONS.get(profile)
+    if sess is None:
+        sess = boto3.session.Session(profile_name=profile) if profile else boto3.session.Session()
+        _SESSIONS[profile] = sess
+    return sess
+
+def get_session(profile: Optional[str] = None) -> boto3.session.Session:
+    """profile별 공유 Session (client 생성은 get_client를 사용할 것)"""
+    with _LOCK:
+        return _session_locked(profile)
+
+def get_client(service: str, region: Optional[str], profile: Optional[str] = None, config=None):
+    """(service, region, profile, config)별 client 재사용"""
+    key = (service, region, profile, config)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _session_locked(profile).client(service, region_name=region, config=config)
+            _CLIENTS[key] = client
+        return client
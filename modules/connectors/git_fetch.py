@@ -1,7 +1,7 @@
 # modules/connectors/git_fetch.py
 from __future__ import annotations
 import os, shutil, subprocess, tempfile
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Optional
 
 def _build_auth_url(git_url: str, token: Optional[str]) -> str:
@@ -10,15 +10,56 @@ def _build_auth_url(git_url: str, token: Optional[str]) -> str:
         return git_url.replace("https://", f"https://{token}@")
     return git_url
 
+# 자격증명 프롬프트 대기/인덱스 잠금 방지
+_GIT_ENV = {"GIT_TERMINAL_PROMPT": "0", "GIT_OPTIONAL_LOCKS": "0"}
+_STDERR_TAIL = 4096
+
+def _git(cmd: list) -> None:
+    """stdout은 버리고 stderr는 실패 시 마지막 ~4KB만 예외에 담음 (진행 출력 전체를 메모리에 쌓지 않음)"""
+    with tempfile.TemporaryFile() as err:
+        rc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=err,
+                            env={**os.environ, **_GIT_ENV}).returncode
+        if rc != 0:
+            size = err.seek(0, os.SEEK_END)
+            err.seek(max(0, size - _STDERR_TAIL))
+            raise subprocess.CalledProcessError(rc, cmd, stderr=err.read())
+
+def _check_subdir(subdir: str) -> None:
+    # git 인자로 넘기기 전에 검증: 상대경로만, '..' 금지, '-'로 시작하면 git이 옵션으로 해석하므로 금지
+    p = PurePosixPath(subdir.replace("\\", "/"))
+    if subdir.startswith("-") or p.is_absolute() or os.path.isabs(subdir) or ".." in p.parts:
+        raise ValueError(f"subdir not found or invalid: {subdir}")
+
 def shallow_clone(git_url: str, branch: str = "main",
-                  subdir: Optional[str] = None, token: Optional[str] = None) -> Path:
-    """깃 얕은 클론(depth=1) 후 subdir만 반환(있으면)"""
+                  subdir: Optional[str] = None, token: Optional[str] = None,
+                  filter_spec: Optional[str] = "blob:none", depth: Optional[int] = 1) -> Path:
+    """
+    깃 부분/얕은 클론 후 subdir만 반환(있으면)
+    - depth=None 이면 전체 히스토리 (이후 git log 등이 필요한 경우)
+    - filter_spec: partial clone 필터. 워킹트리를 전부 체크아웃해 스캔하므로 기본은 blob:none
+      (tree:0은 체크아웃 시 트리를 하나씩 추가로 받아오므로 체크아웃 없는 용도에만 권장)
+    """
+    if subdir:
+        _check_subdir(subdir)
     tmp_root = Path(tempfile.mkdtemp(prefix="dspm-git-"))
     try:
         auth_url = _build_auth_url(git_url, token)
-        cmd = ["git", "clone", "--depth", "1", "--branch", branch,
-               "--filter=blob:none", auth_url, str(tmp_root)]
-        subprocess.run(cmd, check=True, capture_output=True)
+        cmd = ["git", "clone"]
+        if depth is not None:
+            cmd += ["--depth", str(depth)]
+        if filter_spec:
+            cmd.append(f"--filter={filter_spec}")
+        # 대상 브랜치 ref만 받음 (다른 브랜치 ref/객체 협상 생략)
+        cmd += ["--branch", branch, "--single-branch"]
+        if subdir:
+            # subdir만 필요하면 체크아웃을 미루고 sparse-checkout(cone)으로 해당 경로 blob만 받음
+            cmd.append("--no-checkout")
+        _git(cmd + ["--quiet", auth_url, str(tmp_root)])
+        if subdir:
+            git = ["git", "-C", str(tmp_root)]
+            _git(git + ["sparse-checkout", "init", "--cone"])
+            _git(git + ["sparse-checkout", "set", subdir])
+            _git(git + ["checkout", "--quiet", branch])
     except Exception:
         shutil.rmtree(tmp_root, ignore_errors=True)
         raise
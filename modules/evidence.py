@@ -6,10 +6,13 @@ CONF_WEIGHT = {"High": 3, "Medium": 2, "Low": 1}
 def combine_confidences(evidences: List[Dict[str, Any]]) -> str:
     if not evidences:
         return "Low"
-    s = sum(CONF_WEIGHT.get(e.get("confidence","Low"), 1) for e in evidences)
-    avg = s / len(evidences)
-    if avg >= 2.5: return "High"
-    if avg >= 1.5: return "Medium"
+    # confidence 누락/미지정 값은 모두 Low(=1)와 같으므로 기본값 한 번만 지정
+    weight = CONF_WEIGHT.get
+    s = sum(weight(e.get("confidence"), 1) for e in evidences)
+    n = len(evidences)
+    # 평균 >= 2.5 / >= 1.5 를 정수 비교로 (부동소수 나눗셈 없이)
+    if s * 2 >= 5 * n: return "High"
+    if s * 2 >= 3 * n: return "Medium"
     return "Low"
 
 def make_evidence(source: str, kind: str, locator: str, confidence: str="High") -> Dict[str, Any]:
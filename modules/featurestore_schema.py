@@ -1,14 +1,17 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Optional
-import boto3
+from modules.aws_clients import get_client
 from botocore.config import Config
 
 _BOTO_CFG = Config(retries={"max_attempts": 5, "mode": "adaptive"})
+_LIST_PAGE_SIZE = 100  # list_feature_groups MaxResults 상한
+
+def _sm_client(region: str, profile: Optional[str]):
+    # (region, profile)별 client 재사용 — 자격증명/모델 로딩과 커넥션 풀을 호출마다 새로 만들지 않음
+    return get_client("sagemaker", region, profile, _BOTO_CFG)
 
 def describe_feature_group(region: str, name: str, profile: Optional[str]=None) -> Dict[str, Any]:
-    sess = boto3.session.Session(profile_name=profile, region_name=region) if profile \
-        else boto3.session.Session(region_name=region)
-    sm = sess.client("sagemaker", config=_BOTO_CFG)
+    sm = _sm_client(region, profile)
     r = sm.describe_feature_group(FeatureGroupName=name)  # <-- 여기서 FeatureGroup 메타 획득
 
     # 핵심만 추림: Feature 정의(=컬럼), 스토어 위치
@@ -44,18 +47,16 @@ def describe_feature_group(region: str, name: str, profile: Optional[str]=None)
     }
 
 def list_feature_groups(region: str, profile: Optional[str]=None, name_contains: Optional[str]=None) -> List[Dict[str, Any]]:
-    sess = boto3.session.Session(profile_name=profile, region_name=region) if profile \
-        else boto3.session.Session(region_name=region)
-    sm = sess.client("sagemaker", config=_BOTO_CFG)
-
-    out, token = [], None
-    while True:
-        kw = {"NextToken": token} if token else {}
-        if name_contains:
-            kw["NameContains"] = name_contains
-        resp = sm.list_feature_groups(**kw)
-        out.extend(resp.get("FeatureGroupSummaries", []))
-        token = resp.get("NextToken")
-        if not token: break
-
-    return [{"name": i.get("FeatureGroupName"), "arn": i.get("FeatureGroupArn")} for i in out]
+    sm = _sm_client(region, profile)
+
+    # NextToken 체인은 본질적으로 직렬 → 페이지 수 자체를 줄임 (기본 10건/페이지 → 상한 100건)
+    kw: Dict[str, Any] = {"PaginationConfig": {"PageSize": _LIST_PAGE_SIZE}}
+    if name_contains:
+        kw["NameContains"] = name_contains
+    pages = sm.get_paginator("list_feature_groups").paginate(**kw)
+
+    return [
+        {"name": i.get("FeatureGroupName"), "arn": i.get("FeatureGroupArn")}
+        for page in pages
+        for i in page.get("FeatureGroupSummaries", [])
+    ]
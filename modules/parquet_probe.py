@@ -4,7 +4,16 @@ from urllib.parse import urlparse
 
 import pyarrow as pa            # noqa: F401 (type annotations, str(dtype) 용)
 import pyarrow.parquet as pq
-from pyarrow.fs import S3FileSystem
+from botocore.client import Config
+from modules.aws_clients import get_client
+
+_FOOTER_PROBE_BYTES = 64 * 1024   # 1차 ranged GET 크기 (대부분의 footer는 이 안에 들어옴)
+_PARQUET_MAGIC = (b"PAR1", b"PARE")
+
+_S3_CFG = Config(retries={"max_attempts": 5})
+
+def _s3_client(region: Optional[str]):
+    return get_client("s3", region, config=_S3_CFG)
 
 def _split_s3(s3_uri: str) -> tuple[str, str]:
     """s3://bucket/prefix -> (bucket, key)"""
@@ -14,17 +23,31 @@ def _split_s3(s3_uri: str) -> tuple[str, str]:
 def is_parquet_uri(uri: str) -> bool:
     return uri.lower().endswith(".parquet")
 
-def parquet_schema_from_s3(s3_uri: str, region: Optional[str] = None) -> Dict[str, Any]:
+def _read_footer(s3, bucket: str, key: str) -> bytes:
+    """
+    파일 끝 ranged GET으로 footer(메타데이터 + 4B 길이 + magic)만 가져옴
+    - 보통 GET 1회, footer가 probe보다 크면 필요한 만큼 1회 더
+    """
+    tail = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{_FOOTER_PROBE_BYTES}")["Body"].read()
+    if len(tail) < 8 or tail[-4:] not in _PARQUET_MAGIC:
+        raise ValueError(f"not a parquet file: s3://{bucket}/{key}")
+    need = int.from_bytes(tail[-8:-4], "little") + 8
+    if need > len(tail):
+        tail = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{need}")["Body"].read()
+    # 선두 magic을 붙여 footer만으로 유효한 parquet 버퍼 구성 (스키마/메타만 읽으므로 데이터 페이지 불필요)
+    return tail[-4:] + tail[-need:]
+
+def parquet_schema_from_s3(s3_uri: str, region: Optional[str] = None, s3=None) -> Dict[str, Any]:
     """
     Parquet 메타에서 스키마를 추출해 통일된 포맷으로 반환.
     반환 형태는 schema_sampler가 쓰는 dict와 동일하게 맞춤.
     """
     bucket, key = _split_s3(s3_uri)
-    fs = S3FileSystem(region=region) if region else S3FileSystem()
+    s3 = s3 or _s3_client(region)
 
-    # 파일 하나만 열어도 스키마는 동일
-    pf = pq.ParquetFile(f"s3://{bucket}/{key}", filesystem=fs)
-    arrow_schema: pa.Schema = pf.schema_arrow
+    # 파일 하나만 열어도 스키마는 동일 — footer 바이트만으로 메타 파싱 (S3FileSystem의 HEAD+GET 반복 없음)
+    meta = pq.read_metadata(pa.BufferReader(_read_footer(s3, bucket, key)))
+    arrow_schema: pa.Schema = meta.schema.to_arrow_schema()
 
     fields: Dict[str, str] = {}
     for f in arrow_schema:
@@ -39,7 +62,7 @@ def parquet_schema_from_s3(s3_uri: str, region: Optional[str] = None) -> Dict[st
             "fields": fields,
             "sampled_files": [f"s3://{bucket}/{key}"],
             "meta": {
-                "num_row_groups": pf.num_row_groups,
+                "num_row_groups": meta.num_row_groups,
             },
         },
     }
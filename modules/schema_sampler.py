@@ -1,23 +1,27 @@
 from __future__ import annotations
-import io, json, csv, re
-from typing import Dict, Any, List, Tuple
+import io, re, csv, json
+import orjson
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from modules.parquet_probe import is_parquet_uri, parquet_schema_from_s3
-import boto3
+from modules.aws_clients import get_client
 from botocore.client import Config
 
+_S3_CFG = Config(retries={"max_attempts": 5}, max_pool_connections=32)
+
 try:
     import pyarrow.parquet as pq  # 선택
     _HAS_PQ = True
 except Exception:
     _HAS_PQ = False
 
-_S3_RE = re.compile(r"^s3://([^/]+)/?(.*)$")
-
 def parse_s3_uri(uri: str) -> Tuple[str, str]:
-    m = _S3_RE.match(uri)
-    if not m:
-        raise ValueError(f"invalid s3 uri: {uri}")
-    return m.group(1), m.group(2)
+    # 정상 형식(s3://bucket/prefix)은 정규식 없이 partition으로 분해
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[5:].partition("/")
+        if bucket and "\n" not in uri:
+            return bucket, prefix
+    raise ValueError(f"invalid s3 uri: {uri}")
 
 def list_objects_sample(s3, bucket: str, prefix: str, max_objects: int=5) -> List[Dict[str, Any]]:
     out = []
@@ -33,11 +37,11 @@ def list_objects_sample(s3, bucket: str, prefix: str, max_objects: int=5) -> Lis
 
 def _detect_type_from_name(name: str) -> str:
     n = name.lower()
-    if n.endswith(".json") or n.endswith(".jsonl"):
+    if n.endswith((".json", ".jsonl")):
         return "json"
     if n.endswith(".csv"):
         return "csv"
-    if n.endswith(".parquet") or n.endswith(".pq"):
+    if n.endswith((".parquet", ".pq")):
         return "parquet"
     return "unknown"
 
@@ -46,9 +50,28 @@ def _read_head(s3, bucket: str, key: str, max_bytes: int=256*1024) -> bytes:
     r = s3.get_object(Bucket=bucket, Key=key, Range=rng)
     return r["Body"].read()
 
+# JSON 값 타입명 (type(v).__name__ 문자열 조회를 줄이기 위한 테이블)
+_TYPENAME = {int: "int", float: "float", str: "str", bool: "bool", list: "list", dict: "dict", type(None): "NoneType"}
+
+def _add_json_types(fields: Dict[str, Any], obj: Dict[str, Any]) -> None:
+    for k, v in obj.items():
+        fld = fields.get(k)
+        if fld is None:
+            fld = fields[k] = {"types": set(), "nulls": 0}
+        tv = type(v)
+        fld["types"].add(_TYPENAME.get(tv) or tv.__name__)
+
+def _loads(s: str) -> Any:
+    # orjson 우선, 거부하는 입력(NaN/Infinity 등 표준 json.dumps 기본 출력)은 표준 json으로 재시도
+    try:
+        return orjson.loads(s)
+    except orjson.JSONDecodeError:
+        return json.loads(s)
+
 def _schema_from_json(buf: bytes) -> Dict[str, Any]:
     schema: Dict[str, Any] = {"fields": {}}
-    # JSONL/JSON 둘 다 지원: 라인별 파싱 → dict만 취합
+    fields = schema["fields"]
+    # JSONL/JSON 둘 다 지원: (1) 라인별 파싱 → dict만 취합
     lines = buf.decode("utf-8", errors="ignore").splitlines()
     cnt = 0
     for ln in lines[:1000]:
@@ -56,30 +79,27 @@ def _schema_from_json(buf: bytes) -> Dict[str, Any]:
         if not ln:
             continue
         try:
-            obj = json.loads(ln)
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    t = type(v).__name__
-                    schema["fields"].setdefault(k, {"types": set(), "nulls": 0})
-                    schema["fields"][k]["types"].add(t)
-                cnt += 1
+            obj = _loads(ln)
         except Exception:
-            # 비-JSONL이면 통째로 시도
-            try:
-                obj = json.loads("\n".join(lines))
-                if isinstance(obj, dict):
-                    for k, v in obj.items():
-                        t = type(v).__name__
-                        schema["fields"].setdefault(k, {"types": set(), "nulls": 0})
-                        schema["fields"][k]["types"].add(t)
-                    cnt += 1
-            except Exception:
-                pass
-        if cnt >= 50:
-            break
+            continue
+        if isinstance(obj, dict):
+            _add_json_types(fields, obj)
+            cnt += 1
+            if cnt >= 50:
+                break
+
+    # (2) 한 줄도 성공하지 못했으면 비-JSONL(단일 문서)로 보고 통째로 1회만 시도
+    if cnt == 0:
+        try:
+            obj = _loads("\n".join(lines))
+        except Exception:
+            obj = None
+        if isinstance(obj, dict):
+            _add_json_types(fields, obj)
+            cnt = 1
     # set → list
-    for k in list(schema["fields"].keys()):
-        schema["fields"][k]["types"] = sorted(list(schema["fields"][k]["types"]))
+    for fld in fields.values():
+        fld["types"] = sorted(fld["types"])
     schema["sampled_rows"] = cnt
     schema["format"] = "json"
     return schema
@@ -103,16 +123,20 @@ def _schema_from_csv(buf: bytes) -> Dict[str, Any]:
         fields[h]["types"] = sorted(list(fields[h]["types"]))
     return {"fields": fields, "sampled_rows": max(0, len(rows)-1), "format": "csv"}
 
+# int()/float() 허용 형식과 동일 (부호, PEP 515 밑줄, 지수, inf/nan) — 셀마다 예외를 발생시키지 않도록 정규식으로 판별
+_DIGITS = r"\d+(?:_\d+)*"
+_INT_RE = re.compile(rf"[+-]?{_DIGITS}")
+_FLOAT_RE = re.compile(
+    rf"[+-]?(?:(?:(?:{_DIGITS})?\.{_DIGITS}|{_DIGITS}\.?)(?:[eE][+-]?{_DIGITS})?|inf(?:inity)?|nan)",
+    re.IGNORECASE,
+)
+
 def _guess_type(v: str) -> str:
     v = v.strip()
     if not v:
         return "null"
-    try:
-        int(v); return "int"
-    except: pass
-    try:
-        float(v); return "float"
-    except: pass
+    if _INT_RE.fullmatch(v): return "int"
+    if _FLOAT_RE.fullmatch(v): return "float"
     if v.lower() in ("true","false"): return "bool"
     return "string"
 
@@ -127,35 +151,51 @@ def _schema_from_parquet(buf: bytes) -> Dict[str, Any]:
         fields[f.name] = {"types": [str(f.type)]}
     return {"fields": fields, "sampled_rows": 0, "format": "parquet"}
 
+def _sample_one(s3, region: str, bucket: str, key: str, max_bytes: int) -> Optional[Dict[str, Any]]:
+    """객체 1개의 스키마 추출 (기타 포맷은 None)"""
+    obj_uri = f"s3://{bucket}/{key}"
+    ftype = _detect_type_from_name(key)
+
+    # 1) Parquet이면: footer ranged GET으로 메타 스키마 직접 추출(정확)
+    if ftype == "parquet":
+        rec = parquet_schema_from_s3(obj_uri, region=region, s3=s3)
+        return rec["schema"]
+
+    # 2) 그 외(JSON/CSV): 기존처럼 head 일부만 읽어서 샘플링
+    if ftype not in ("json", "csv"):
+        # 기타 포맷은 스킵
+        return None
+    head = _read_head(s3, bucket, key, max_bytes=max_bytes)
+    return _schema_from_json(head) if ftype == "json" else _schema_from_csv(head)
+
 def sample_schema(region: str, s3_uri: str, max_objects: int=5, max_bytes: int=256*1024) -> Dict[str, Any]:
     """s3://... prefix에서 일부 객체의 head만 읽어 스키마 추출"""
-    s3 = boto3.client("s3", region_name=region, config=Config(retries={"max_attempts": 5}))
+    # scan_if_missing 시 여러 스레드에서 동시에 호출됨 → 기본 Session 공유(boto3.client) 대신 락으로 보호되는 공용 캐시 사용
+    s3 = get_client("s3", region, config=_S3_CFG)
     bucket, prefix = parse_s3_uri(s3_uri)
     objs = list_objects_sample(s3, bucket, prefix, max_objects=max_objects)
 
     merged: Dict[str, Any] = {"format": None, "fields": {}, "sampled_files": []}
 
-    for o in objs:
-        key = o["Key"]
-        obj_uri = f"s3://{bucket}/{key}"
-        ftype = _detect_type_from_name(key)
+    # 객체별 ranged GET은 서로 독립 → 동시에 읽고, 머지는 목록 순서대로 메인 스레드에서
+    def _task(o: Dict[str, Any]):
+        try:
+            return _sample_one(s3, region, bucket, o["Key"], max_bytes)
+        except Exception as e:
+            return e
+
+    results: List[Any] = []
+    if objs:
+        with ThreadPoolExecutor(max_workers=len(objs)) as ex:
+            results = list(ex.map(_task, objs))
 
+    for o, sc in zip(objs, results):
+        key = o["Key"]
+        if sc is None:
+            continue
         try:
-            # 1) Parquet이면: pyarrow로 S3에서 메타 스키마 직접 추출(정확)
-            if ftype == "parquet":
-                rec = parquet_schema_from_s3(obj_uri, region=region)   # ← 새 경로
-                sc = rec["schema"]
-
-            else:
-                # 2) 그 외(JSON/CSV): 기존처럼 head 일부만 읽어서 샘플링
-                head = _read_head(s3, bucket, key, max_bytes=max_bytes)
-                if ftype == "json":
-                    sc = _schema_from_json(head)
-                elif ftype == "csv":
-                    sc = _schema_from_csv(head)
-                else:
-                    # 기타 포맷은 스킵
-                    continue
+            if isinstance(sc, Exception):
+                raise sc
 
             # -- 공통 머지 로직 --
             for k, meta in sc.get("fields", {}).items():
@@ -168,11 +208,11 @@ def sample_schema(region: str, s3_uri: str, max_objects: int=5, max_bytes: int=2
                 merged["format"] = sc.get("format")
 
         except Exception as e:
-            print(f"[schema] skip {obj_uri}: {e}")
+            print(f"[schema] skip s3://{bucket}/{key}: {e}")
             continue
 
     # set → list
     for k in list(merged["fields"].keys()):
         merged["fields"][k]["types"] = sorted(list(merged["fields"][k]["types"]))
 
-    return merged
\ No newline at end of file
+    return merged
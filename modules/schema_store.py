@@ -1,5 +1,7 @@
 from __future__ import annotations
-import json, os, hashlib, time
+import json, os, re, mmap, hashlib, time, threading
+import orjson
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 
 _STORE_DIR = os.getenv("SCHEMA_STORE_DIR", "./data")
@@ -9,16 +11,18 @@ def _ensure_dir():
     os.makedirs(_STORE_DIR, exist_ok=True)
 
 def _policy_hash(policy: Dict[str, Any]) -> str:
+    # 저장된 policy_hash와 비교 가능해야 하므로 직렬화 형식(json.dumps 기본 구분자/ASCII 이스케이프)을 바꾸지 않음
     h = hashlib.sha256(json.dumps(policy, sort_keys=True).encode()).hexdigest()[:16]
     return h
 
+@lru_cache(maxsize=4096)
 def dataset_id_from_s3(bucket: str, prefix: str) -> str:
     # 버킷/프리픽스 기반 간단 ID
     p = prefix.strip("/").replace("/", "::")
     return f"s3://{bucket}/{p}"
 
 def save_schema(dataset_id: str, schema: Dict[str, Any], policy: Dict[str, Any]) -> Dict[str, Any]:
-    """스키마 버전 append 저장"""
+    """스키마 버전 append 저장 (+ 인덱스에 위치 기록)"""
     _ensure_dir()
     rec = {
         "dataset_id": dataset_id,
@@ -28,33 +32,185 @@ def save_schema(dataset_id: str, schema: Dict[str, Any], policy: Dict[str, Any])
         "schema": schema,
         "sampled_at": int(time.time()),
     }
-    with open(_STORE_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    line = orjson.dumps(rec, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    # 스토어 append와 인덱스 append를 한 락 안에서 수행 → 동시 저장 시 offset이 다른 레코드를 가리키지 않음
+    #  (append 모드의 f.tell()은 첫 write 전까지 실제 끝을 보장하지 않으므로 fstat으로 끝 위치를 얻음)
+    with _WRITE_LOCK:
+        with open(_STORE_FILE, "ab") as f:
+            offset = os.fstat(f.fileno()).st_size
+            f.write(line)
+        with open(_INDEX_FILE, "ab") as f:
+            f.write(f"{dataset_id}\t{rec['version']}\t{offset}\t{len(line)}\n".encode("utf-8"))
     return rec
 
-def list_versions(dataset_id: str) -> List[Dict[str, Any]]:
+# ---------------------------
+# 인덱스 (dataset_id -> [(version, offset, length)])
+#  - 조회 시 jsonl 전체를 파싱하지 않고 해당 dataset의 라인만 seek로 읽음
+#  - 인덱스가 없거나 jsonl을 전부 덮지 못하면(이전 버전 스토어 등) jsonl 1회 스캔으로 재생성
+# ---------------------------
+
+_INDEX_FILE = os.path.join(_STORE_DIR, "schema_store.idx")
+_WRITE_LOCK = threading.Lock()  # save_schema / 인덱스 재생성 직렬화
+_Entry = Tuple[int, int, int]  # (version, offset, length)
+
+# 레코드 앞부분({"dataset_id": ..., "version": N, ...})만으로 인덱스 항목 추출 → 큰 schema 본문은 파싱하지 않음
+_HEAD_RE = re.compile(rb'\{\s*"dataset_id"\s*:\s*("(?:[^"\\]|\\.)*")\s*,\s*"version"\s*:\s*(\d+)')
+
+def _index_head(raw: bytes) -> Tuple[str, int]:
+    m = _HEAD_RE.match(raw)
+    if m:
+        return orjson.loads(m.group(1)), int(m.group(2))
+    o = orjson.loads(raw)  # 키 순서가 다른 레코드는 전체 파싱
+    return o["dataset_id"], int(o.get("version") or 0)
+
+def _rebuild_index() -> None:
+    with _WRITE_LOCK:
+        _rebuild_index_locked()
+
+def _rebuild_index_locked() -> None:
+    lines: List[str] = []
+    size = os.path.getsize(_STORE_FILE)
+    if size:
+        with open(_STORE_FILE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 줄 경계는 mm.find(b"\n")(memchr)로 찾고, 각 줄은 head만 확인
+            offset = 0
+            while offset < size:
+                end = mm.find(b"\n", offset)
+                end = size if end < 0 else end + 1
+                try:
+                    dsid, ver = _index_head(mm[offset:end])
+                    lines.append(f"{dsid}\t{ver}\t{offset}\t{end - offset}\n")
+                except Exception:
+                    # 파싱 불가 줄(쓰다 끊긴 마지막 줄 등)도 빈 dataset_id로 위치를 남겨 커버리지에 포함
+                    #  → 다음 append 전까지 매 조회마다 재생성하지 않음
+                    lines.append(f"\t0\t{offset}\t{end - offset}\n")
+                offset = end
+    tmp = _INDEX_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(tmp, _INDEX_FILE)
+
+@lru_cache(maxsize=4)
+def _parse_index(mtime_ns: int, size: int) -> Tuple[Dict[str, List[_Entry]], int]:
+    # 인덱스 파일 상태(mtime, size)가 키 → 파일이 바뀌면 자동으로 다시 읽음
+    idx: Dict[str, List[_Entry]] = {}
+    covered = 0
+    with open(_INDEX_FILE, "r", encoding="utf-8") as f:
+        for ln in f:
+            parts = ln.rstrip("\n").rsplit("\t", 3)
+            if len(parts) != 4:
+                continue
+            try:
+                ver, off, length = int(parts[1]), int(parts[2]), int(parts[3])
+            except ValueError:
+                continue
+            covered = max(covered, off + length)
+            if parts[0]:  # 빈 dataset_id = 파싱 불가 줄 자리표시
+                idx.setdefault(parts[0], []).append((ver, off, length))
+    return idx, covered
+
+def _load_index() -> Dict[str, List[_Entry]]:
     if not os.path.exists(_STORE_FILE):
-        return []
+        return {}
+    idx: Dict[str, List[_Entry]] = {}
+    for attempt in range(2):
+        if os.path.exists(_INDEX_FILE):
+            st = os.stat(_INDEX_FILE)
+            idx, covered = _parse_index(st.st_mtime_ns, st.st_size)
+            if covered >= os.path.getsize(_STORE_FILE):
+                return idx
+        if attempt == 0:
+            _rebuild_index()
+    return idx
+
+def _read_records(dataset_id: str, entries: List[_Entry]) -> Tuple[List[Dict[str, Any]], bool]:
+    """인덱스 항목이 가리키는 레코드 읽기 → (레코드, 불일치 여부)
+    dataset_id/version이 항목과 다르면(인덱스가 어긋난 경우) 버리고 불일치로 표시"""
     out: List[Dict[str, Any]] = []
-    with open(_STORE_FILE, "r", encoding="utf-8") as f:
-        for line in f:
+    stale = False
+    if not entries or not os.path.exists(_STORE_FILE):
+        return out, stale
+    with open(_STORE_FILE, "rb") as f:
+        for ver, off, length in entries:
+            f.seek(off)
             try:
-                o = json.loads(line)
-                if o.get("dataset_id") == dataset_id:
-                    out.append(o)
+                o = orjson.loads(f.read(length))
             except Exception:
-                pass
+                stale = True
+                continue
+            if o.get("dataset_id") == dataset_id and o.get("version") == ver:
+                out.append(o)
+            else:
+                stale = True
+    return out, stale
+
+def _read_dataset(dataset_id: str, pick=None) -> List[Dict[str, Any]]:
+    # 인덱스가 어긋나 있으면 1회 재생성 후 다시 읽음
+    for attempt in range(2):
+        entries = _load_index().get(dataset_id, [])
+        if pick is not None:
+            entries = pick(entries)
+        out, stale = _read_records(dataset_id, entries)
+        if not stale or attempt:
+            return out
+        _rebuild_index()
+    return out
+
+def list_versions(dataset_id: str) -> List[Dict[str, Any]]:
+    out = _read_dataset(dataset_id)
     # 최신이 앞으로 오게 정렬
     out.sort(key=lambda r: r.get("version", 0), reverse=True)
     return out
 
+def list_version_summaries(dataset_id: str) -> List[Dict[str, Any]]:
+    """버전 목록 조회용 요약(version/sampled_at/policy)만 추출 — 무거운 schema 본문은 보관하지 않음"""
+    out = [
+        {"version": o.get("version"), "sampled_at": o.get("sampled_at"), "policy": o.get("policy")}
+        for o in _read_dataset(dataset_id)
+    ]
+    out.sort(key=lambda r: r.get("version") or 0, reverse=True)
+    return out
+
+@lru_cache(maxsize=1024)
+def _get_exact_version(dataset_id: str, version: int) -> Dict[str, Any]:
+    # 특정 버전 레코드는 불변이므로 캐시. 못 찾으면 예외 → lru_cache가 저장하지 않음
+    recs = _read_dataset(dataset_id, lambda entries: [e for e in entries if e[0] == version])
+    if recs:
+        return recs[-1]
+    raise KeyError((dataset_id, version))
+
 def get_version(dataset_id: str, version: Optional[int]=None) -> Optional[Dict[str, Any]]:
-    vers = list_versions(dataset_id)
-    if not vers:
-        return None
-    if version is None:
-        return vers[0]
-    for v in vers:
-        if v.get("version") == version:
-            return v
-    return None
\ No newline at end of file
+    if version is not None:
+        try:
+            return _get_exact_version(dataset_id, version)
+        except KeyError:
+            return None
+    latest = get_latest_many([dataset_id])
+    return latest.get(dataset_id)
+
+def get_latest_many(dataset_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """여러 dataset_id의 최신 버전을 인덱스로 조회 (없는 id는 결과에서 제외)"""
+    idx = _load_index()
+    out: Dict[str, Dict[str, Any]] = {}
+    rebuilt = False
+    for dsid in dict.fromkeys(dataset_ids):
+        while True:
+            # 같은 version이면 나중에 쓰인 레코드 우선 (기존 >= 비교와 동일)
+            #  - 항목이 다른 레코드를 가리키면(dataset_id/version 불일치) 이전 항목으로 넘어감
+            rec, stale = None, False
+            for e in sorted(idx.get(dsid, []), key=lambda e: (e[0], e[1]), reverse=True):
+                recs, bad = _read_records(dsid, [e])
+                stale = stale or bad
+                if recs:
+                    rec = recs[0]
+                    break
+            # 더 최신 항목이 어긋나 있었다면 진짜 최신 레코드가 누락됐을 수 있음 → 인덱스 1회 재생성 후 재시도
+            if stale and not rebuilt:
+                _rebuild_index()
+                idx = _load_index()
+                rebuilt = True
+                continue
+            if rec is not None:
+                out[dsid] = rec
+            break
+    return out
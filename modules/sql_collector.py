@@ -1,12 +1,12 @@
 from __future__ import annotations
-import os, re, glob
+import os, re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from modules.sql_try import try_parse
 
 SQL_EXT = (".sql",)
-DBT_GLOBS = ["models/**/*.sql", "seeds/**/*.sql"]
 
 # 간단한 임베디드 SQL 탐지 정규식(필요 시 강화 가능)
 SQL_REGEX = re.compile(
@@ -14,7 +14,9 @@ SQL_REGEX = re.compile(
     re.IGNORECASE | re.DOTALL,
 )
 
-SQL_GLOB_PATTERNS = ["**/*.sql", "models/**/*.sql", "seeds/**/*.sql"]
+# 추출+파싱(sqlglot, CPU 바운드) 프로세스 풀 크기 / 풀을 쓸 최소 파일 수(적으면 프로세스 기동 비용이 더 큼)
+SQL_PARSE_WORKERS = int(os.getenv("SQL_PARSE_WORKERS", str(os.cpu_count() or 1)))
+SQL_PARSE_POOL_MIN = int(os.getenv("SQL_PARSE_POOL_MIN", "32"))
 
 PY_SQL_REGEX = re.compile(
     r"""(?P<sql>
@@ -24,36 +26,62 @@ PY_SQL_REGEX = re.compile(
     re.IGNORECASE | re.DOTALL,
 )
 
+# 위 두 정규식은 lazy(.*?) + DOTALL 이라 SQL이 없는 긴 파일에서 역추적 비용이 큼
+# → 선형 키워드 검사로 SQL이 없는 파일만 먼저 걸러냄
+#   (PY_SQL_REGEX는 VERBOSE가 아니라 앞 줄바꿈/들여쓰기까지 패턴에 포함되므로 통과한 파일은 항상 0부터 매칭)
+_SQL_HEAD_HINT = re.compile(r"create\s+table|insert\s+into", re.IGNORECASE)
+_SQL_SELECT_HINT = re.compile(r"select", re.IGNORECASE)
+
+def _may_contain_sql(text: str) -> bool:
+    """임베디드 SQL 후보 여부 (False면 정규식 매칭 결과가 없음이 보장됨)"""
+    m = _SQL_HEAD_HINT.search(text)
+    return bool(m and _SQL_SELECT_HINT.search(text, m.end()))
+
 def _read(p: str) -> str:
     with open(p, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
 
+def _iter_files(root: str, suffixes: Tuple[str, ...]):
+    """os.scandir 기반 재귀 워크 — 엔트리 타입은 getdents 결과(d_type)로 판별해 파일마다 stat하지 않음
+    숨김 폴더(.git, .venv, .tox 등 '.'로 시작)는 SQL 소스가 아니므로 통째로 건너뜀"""
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if not e.name.startswith("."):
+                        subdirs.append(e.path)
+                elif e.name.lower().endswith(suffixes) and e.is_file():
+                    yield e.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
 def collect_from_repo(repo_path: str) -> List[Dict[str, Any]]:
-    """레포 경로에서 .sql, dbt 폴더, .py 임베디드 SQL을 수집해 원문 SQL 리스트로 반환"""
+    """레포 경로에서 .sql(dbt models/seeds 포함), .py 임베디드 SQL을 수집해 원문 SQL 리스트로 반환"""
     items: List[Dict[str, Any]] = []
+    py_items: List[Dict[str, Any]] = []
 
-    # 1) 일반 .sql
-    for p in glob.glob(os.path.join(repo_path, "**", "*"), recursive=True):
+    # 디렉터리 1회 워크로 .sql / .py 를 함께 수집
+    for p in _iter_files(repo_path, SQL_EXT + (".py",)):
         if p.lower().endswith(SQL_EXT):
             s = _read(p).strip()
             if s:
                 items.append({"file": p, "sql": s})
+        elif p.lower().endswith(".py"):
+            text = _read(p)
+            m = SQL_REGEX.search(text) if _may_contain_sql(text) else None
+            if m:
+                py_items.append({"file": p, "sql": m.group(0)})
 
-    # 2) dbt 전용 경로
-    for pattern in DBT_GLOBS:
-        for p in glob.glob(os.path.join(repo_path, pattern), recursive=True):
-            s = _read(p).strip()
-            if s:
-                items.append({"file": p, "sql": s})
-
-    # 3) .py 임베디드 SQL(라이트 탐지)
-    for p in glob.glob(os.path.join(repo_path, "**", "*.py"), recursive=True):
-        text = _read(p)
-        m = SQL_REGEX.search(text)
-        if m:
-            items.append({"file": p, "sql": m.group(0)})
-
-    return items
+    return items + py_items
 
 def _read_text(fp: Path) -> str:
     try:
@@ -61,29 +89,22 @@ def _read_text(fp: Path) -> str:
     except Exception:
         return ""
 
-def _scan_sql_files(root: Path) -> List[Tuple[Path, str]]:
-    out = []
-    for pat in SQL_GLOB_PATTERNS:
-        for fp in root.glob(pat):
-            if fp.is_file():
-                s = _read_text(fp).strip()
-                if s:
-                    out.append((fp, s))
-    return out
-
-def _scan_python_embedded_sql(root: Path) -> List[Tuple[Path, str]]:
-    out = []
-    for fp in root.glob("**/*.py"):
-        if not fp.is_file():
-            continue
-        text = _read_text(fp)
-        if not text:
-            continue
-        for m in PY_SQL_REGEX.finditer(text):
-            sql = m.group("sql")
-            if sql and len(sql) >= 20:
-                out.append((fp, sql))
-    return out
+def _extract_sql(path: str) -> List[Tuple[Path, str]]:
+    """파일 1개에서 SQL 추출 (.sql → 본문 전체, .py → 임베디드 SQL)"""
+    fp = Path(path)
+    text = _read_text(fp)
+    if not text:
+        return []
+    if path.lower().endswith(".py"):
+        if not _may_contain_sql(text):
+            return []
+        return [(fp, sql) for m in PY_SQL_REGEX.finditer(text) if (sql := m.group("sql")) and len(sql) >= 20]
+    s = text.strip()
+    return [(fp, s)] if s else []
+
+def _extract_and_parse(path: str, dialect: Optional[str]) -> List[Tuple[Path, str, Dict[str, Any]]]:
+    # 워커 프로세스에서 읽기+정규식+파싱을 한 번에 → 메인은 집계만
+    return [(fp, sql, try_parse(sql, dialect=dialect)) for fp, sql in _extract_sql(path)]
 
 def collect_sql(root: Path, dialect: Optional[str] = None) -> List[Dict[str, Any]]:
     """
@@ -93,8 +114,17 @@ def collect_sql(root: Path, dialect: Optional[str] = None) -> List[Dict[str, Any
     results: List[Dict[str, Any]] = []
     ts = int(datetime.utcnow().timestamp())
 
-    def _append(fp: Path, sql: str):
-        res = try_parse(sql, dialect=dialect)
+    # .sql 파일 먼저, 그 다음 .py 임베디드 SQL (기존 반환 순서 유지)
+    paths = list(_iter_files(str(root), (".sql", ".py")))
+    paths = [p for p in paths if p.lower().endswith(".sql")] + [p for p in paths if p.lower().endswith(".py")]
+    dialects = [dialect] * len(paths)
+    if len(paths) >= SQL_PARSE_POOL_MIN and SQL_PARSE_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=SQL_PARSE_WORKERS) as ex:
+            per_file = list(ex.map(_extract_and_parse, paths, dialects, chunksize=16))
+    else:
+        per_file = [_extract_and_parse(p, dialect) for p in paths]
+
+    for fp, sql, res in (rec for recs in per_file for rec in recs):
         if res.get("ok") and (res.get("dst") or res.get("sources")):
             results.append({
                 "file": str(fp),
@@ -105,10 +135,4 @@ def collect_sql(root: Path, dialect: Optional[str] = None) -> List[Dict[str, Any
                 "ts": ts,
             })
 
-    for fp, sql in _scan_sql_files(root):
-        _append(fp, sql)
-
-    for fp, sql in _scan_python_embedded_sql(root):
-        _append(fp, sql)
-
     return results
@@ -1,5 +1,6 @@
 from __future__ import annotations
-import json, os, time
+import os, time
+import orjson
 from typing import Dict, Any, Iterable, List, Optional
 
 STORE = os.getenv("SQL_LINEAGE_STORE", "data/sql_lineage.jsonl")
@@ -11,8 +12,8 @@ def _ensure_dir():
 def put(record: Dict[str, Any]) -> None:
     _ensure_dir()
     rec = {**record, "ts": record.get("ts") or int(time.time())}
-    with open(STORE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    with open(STORE, "ab") as f:
+        f.write(orjson.dumps(rec, option=orjson.OPT_NON_STR_KEYS) + b"\n")
 
 def _read_all() -> Iterable[Dict[str, Any]]:
     if not os.path.exists(STORE):
@@ -21,7 +22,7 @@ def _read_all() -> Iterable[Dict[str, Any]]:
         for line in f:
             line=line.strip()
             if not line: continue
-            try: yield json.loads(line)
+            try: yield orjson.loads(line)
             except Exception: continue
 
 def get_by_job(job_id: str) -> List[Dict[str, Any]]:
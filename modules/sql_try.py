@@ -1,6 +1,8 @@
 # modules/sql_try.py
 from __future__ import annotations
-from typing import Optional, Dict, Any, List, Set
+import copy, hashlib, os, threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 # 1) 우선, 있으면 기존 경량 파서의 parse_sql을 사용
 _PARSE_SQL_LIGHT = None
@@ -103,12 +105,37 @@ def _parse_with_sqlglot(sql: str, dialect: Optional[str]) -> Dict[str, Any]:
     }
 
 
+# 같은 SQL(dbt 매크로/보일러플레이트 CTE 등)이 반복되면 파싱 결과 재사용
+# 키는 SQL 본문 대신 16바이트 digest → 긴 SQL 문자열을 캐시에 붙잡아 두지 않음
+_PARSE_CACHE_MAX = int(os.getenv("SQL_PARSE_CACHE_MAX", "4096"))
+_PARSE_CACHE: "OrderedDict[Tuple[bytes, Optional[str]], Dict[str, Any]]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
 def try_parse(sql: str, dialect: Optional[str] = None) -> Dict[str, Any]:
     """
     통합 래퍼:
     - modules.sql_lineage_light.parse_sql 이 있으면 그걸 호출(기존 동작 유지)
     - 없으면 sqlglot 기반 폴백 파서 사용
+    - (sql, dialect) 단위 LRU 캐시 (호출자가 결과를 수정해도 캐시는 영향 없도록 복사본 반환)
     """
+    key = (hashlib.blake2s(sql.encode("utf-8", "surrogatepass"), digest_size=16).digest(), dialect)
+    with _PARSE_CACHE_LOCK:
+        hit = _PARSE_CACHE.get(key)
+        if hit is not None:
+            _PARSE_CACHE.move_to_end(key)
+    if hit is not None:
+        return copy.deepcopy(hit)
+
+    res = _try_parse_impl(sql, dialect)
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = res
+        if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.popitem(last=False)
+    return copy.deepcopy(res)
+
+
+def _try_parse_impl(sql: str, dialect: Optional[str]) -> Dict[str, Any]:
     if _PARSE_SQL_LIGHT is not None:
         try:
             ok, dst, sources, columns, note = _PARSE_SQL_LIGHT(sql, dialect=dialect)  # type: ignore